@@ -0,0 +1,122 @@
+"""
+Mide cómo crece el tiempo de ``keyword_tools.cluster_keywords``.
+
+Agrupa conjuntos de palabras clave sintéticas de tamaño creciente (frases
+de una a tres palabras con sílabas del español, artículos y variantes con
+errores de dedo o plurales) y reporta el tiempo, el número de grupos y el
+exponente de crecimiento entre tamaños consecutivos: 1 es lineal y 2
+cuadrático. Termina con código 1 si el exponente promedio llega a
+``MAX_EXPONENT``.
+
+Uso::
+
+    python benchmarks/keyword_clustering.py
+    python benchmarks/keyword_clustering.py --tamanos 1000 4000 16000 --umbral 0.6
+"""
+
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import keyword_tools  # noqa: E402
+
+SIZES = (1000, 2000, 4000, 8000, 16000)
+MAX_EXPONENT = 1.8
+SYLLABLES = (
+    "ba be bi bo ca ce ci co cu da de di do du fa fe fi la le li lo lu ma me mi mo "
+    "na ne ni no pa pe pi po pu ra re ri ro sa se si so ta te ti to tu va ve vi "
+    "es en el al con por ción dad mente"
+).split()
+ARTICLES = ("la", "el", "los", "las", "de", "del", "en", "un", "una")
+VARIANT_RATE = 0.3
+
+
+def _mutate(rng, word):
+    index = rng.randrange(len(word) + 1)
+    operation = rng.random()
+    if operation < 0.3:
+        return f"{word}s"
+    if operation < 0.6 and len(word) > 1:
+        return word[:index] + word[index + 1 :]
+    return word[:index] + rng.choice("aeiourstn") + word[index:]
+
+
+def make_keywords(count, seed=0):
+    """
+    Crea palabras clave sintéticas con su frecuencia.
+
+    Parámetros
+    ----------
+    count : int
+        Número de palabras clave distintas.
+    seed : int, optional
+        Semilla del generador.
+
+    Retorna
+    -------
+    dict
+        Diccionario ``palabra clave -> frecuencia``.
+    """
+    rng = random.Random(seed)
+    vocabulary = [
+        "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+        for _ in range(max(50, count // 3))
+    ]
+    keywords = {}
+    words = []
+    while len(keywords) < count:
+        if words and rng.random() < VARIANT_RATE:
+            word = _mutate(rng, rng.choice(words))
+        else:
+            parts = []
+            for position in range(rng.randint(1, 3)):
+                if position and rng.random() < 0.5:
+                    parts.append(rng.choice(ARTICLES))
+                parts.append(rng.choice(vocabulary))
+            word = " ".join(parts)
+        if word not in keywords:
+            keywords[word] = rng.randint(1, 200)
+            words.append(word)
+    return keywords
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tamanos", type=int, nargs="+", default=SIZES, help="número de palabras clave")
+    parser.add_argument("--umbral", type=float, default=0.5, help="similitud mínima")
+    parser.add_argument("--semilla", type=int, default=0, help="semilla de las palabras clave")
+    args = parser.parse_args()
+
+    if keyword_tools._distance_kernel() is keyword_tools.bounded_levenshtein:
+        print("distancia con bounded_levenshtein (rapidfuzz no está instalado)")
+    else:
+        print("distancia con rapidfuzz")
+    previous = None
+    exponents = []
+    for size in sorted(args.tamanos):
+        keywords = make_keywords(size, args.semilla)
+        start = time.perf_counter()
+        groups = keyword_tools.cluster_keywords(keywords, args.umbral)
+        seconds = time.perf_counter() - start
+        line = f"{size:>8} palabras  {len(groups):>8} grupos  {seconds:9.3f} s"
+        if previous is not None and previous[1] > 0:
+            exponent = math.log(seconds / previous[1]) / math.log(size / previous[0])
+            exponents.append(exponent)
+            line += f"  exponente {exponent:.2f}"
+        print(line)
+        previous = (size, seconds)
+    if exponents:
+        mean = sum(exponents) / len(exponents)
+        print(f"exponente promedio {mean:.2f}")
+        if mean >= MAX_EXPONENT:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
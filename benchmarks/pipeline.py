@@ -0,0 +1,337 @@
+"""
+Mide cada etapa del pipeline con tweets sintéticos.
+
+Para cada tamaño se genera un archivo de descarga con
+``synthetic_tweets.py`` y se ejecutan, en orden, la lectura del archivo,
+las palabras clave, los sentimientos, la legibilidad, las gráficas y los
+reportes PDF, registrando tiempo real, tiempo de CPU, memoria y
+elementos por segundo de cada etapa con ``profile_tools.stage``. Las
+etapas cuyas dependencias no están instaladas se reportan como omitidas.
+
+Los resultados pueden guardarse como base (``--guardar-base``) y
+compararse con ella en ejecuciones posteriores (``--comparar``); si
+alguna etapa tarda más que la base más la tolerancia, o falla cuando en
+la base funcionaba, el programa termina con código 1.
+
+Uso::
+
+    python benchmarks/pipeline.py --tamanos 100 1000 10000
+    python benchmarks/pipeline.py --tamanos 1000 --guardar-base
+    python benchmarks/pipeline.py --tamanos 1000 --comparar
+    python benchmarks/pipeline.py --tamanos 1000000 --etapas lectura legibilidad
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import corpus_tools  # noqa: E402
+import model_tools  # noqa: E402
+import plot_tools  # noqa: E402
+import profile_tools  # noqa: E402
+import sentiment_tools  # noqa: E402
+import text_tools  # noqa: E402
+import tweet_tools  # noqa: E402
+
+from synthetic_tweets import write_scrape_file  # noqa: E402
+
+SIZES = (100, 1000, 10000)
+STAGES = ("lectura", "palabras_clave", "sentimientos", "legibilidad", "graficas", "reportes")
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+# Una etapa es una regresión si tarda más que la base por este factor.
+TOLERANCE = 0.2
+# Las etapas más cortas que esto varían demasiado para compararlas.
+MIN_COMPARABLE_SECONDS = 0.05
+
+
+def _stage_lectura(context):
+    tweets = list(tweet_tools.iter_tweets(context["path"]))
+    context["tweets"] = tweets
+    context["corpus"] = corpus_tools.build_corpus(tweet.full_text for tweet in tweets)
+    return len(tweets)
+
+
+def _stage_palabras_clave(context):
+    context["keywords"] = text_tools.get_frecuency_key_words(context["corpus"])
+    return len(context["corpus"])
+
+
+def _stage_sentimientos(context):
+    result = text_tools.get_sentiment_result(context["corpus"])
+    context["sentiments"] = text_tools.get_sentiment_analyze(context["corpus"], result)
+    text_tools.get_sentiment_detail(context["corpus"], result)
+    return len(context["corpus"])
+
+
+def _stage_legibilidad(context):
+    context["readability"] = text_tools.get_flesch_kincaid_test(context["corpus"])
+    return len(context["corpus"])
+
+
+def _stage_graficas(context):
+    corpus = context["corpus"]
+    # Si una etapa anterior se omitió se grafican valores de ejemplo.
+    sentiments = context.get("sentiments") or {"Positive": 1, "Negative": 1, "Neutral": 1}
+    keywords = context.get("keywords") or dict(corpus.token_frequencies.most_common(10))
+    readability = context.get("readability") or [50.0] * len(corpus)
+    formato = {"in_memory": True}
+    context["charts"] = plot_tools.render_charts(
+        [
+            (plot_tools.get_pie_chart, ("bench", None, sentiments), formato),
+            (plot_tools.get_barh_chart, ("bench", None, keywords), formato),
+            (plot_tools.get_point_plot, ("bench", None, readability), formato),
+            (plot_tools.get_word_cloud, ("bench", None, corpus.token_frequencies), formato),
+        ]
+    )
+    return len(context["charts"])
+
+
+def _stage_reportes(context):
+    pie, barh, point, _ = context["charts"]
+    report = {
+        "fecha": f"bench_{len(context['tweets'])}",
+        "ruta": context["directory"],
+        "titulo": "#Benchmark",
+        "autor": "Benchmark",
+        "imagenes": [point, point, barh, pie, point],
+        "textos_imagenes": ["Legibilidad", "Historial", "Palabras clave", "Sentimientos"],
+        "textos": ["Twitter", "10"],
+    }
+    plot_tools.get_reports_pdf([report], engine=context["engine"])
+    return 1
+
+
+_STAGE_FUNCTIONS = {
+    "lectura": _stage_lectura,
+    "palabras_clave": _stage_palabras_clave,
+    "sentimientos": _stage_sentimientos,
+    "legibilidad": _stage_legibilidad,
+    "graficas": _stage_graficas,
+    "reportes": _stage_reportes,
+}
+
+
+def run_size(size, stages, directory, engine, seed=0):
+    """
+    Ejecuta las etapas del pipeline con un número de tweets.
+
+    Parámetros
+    ----------
+    size : int
+        Número de tweets sintéticos.
+    stages : list
+        Etapas a ejecutar (llaves de ``_STAGE_FUNCTIONS``).
+    directory : str
+        Carpeta para el archivo de descarga y los reportes.
+    engine : str
+        Motor de ``plot_tools.get_reports_pdf``.
+    seed : int, optional
+        Semilla de los tweets sintéticos.
+
+    Retorna
+    -------
+    list
+        Un diccionario por etapa con ``size``, ``stage``, ``status`` y
+        las medidas de ``profile_tools.stage``.
+    """
+    path = os.path.join(directory, f"tweets_{size}.json")
+    start = time.perf_counter()
+    write_scrape_file(path, size, seed)
+    print(f"{size} tweets generados en {time.perf_counter() - start:.2f} s")
+    context = {"path": path, "directory": directory, "engine": engine}
+    results = []
+    # La lectura siempre se ejecuta: las demás etapas usan su corpus.
+    for stage in ["lectura"] + [name for name in stages if name != "lectura"]:
+        row = {"size": size, "stage": stage}
+        try:
+            with profile_tools.stage(stage, topic=f"n={size}") as record:
+                record["items"] = _STAGE_FUNCTIONS[stage](context)
+        except ImportError as error:
+            row["status"] = f"omitida ({error})"
+        except Exception as error:
+            row["status"] = f"error ({error!r})"
+        else:
+            row["status"] = "ok"
+            row.update(
+                {
+                    field: record[field]
+                    for field in (
+                        "wall_seconds",
+                        "cpu_seconds",
+                        "items",
+                        "rss_mb",
+                        "peak_rss_mb",
+                        "peak_rss_growth_mb",
+                    )
+                }
+            )
+            row["items_per_second"] = (
+                record["items"] / record["wall_seconds"]
+                if record["items"] and record["wall_seconds"] > 0
+                else None
+            )
+        results.append(row)
+        _print_row(row)
+    return results
+
+
+def _print_row(row):
+    if row["status"] != "ok":
+        print(f"  {row['stage']:<15} {row['status']}")
+        return
+    throughput = row["items_per_second"]
+    line = (
+        f"  {row['stage']:<15} {row['wall_seconds']:9.3f} s  "
+        f"cpu {row['cpu_seconds']:9.3f} s  "
+        f"{throughput or 0:12.1f} elem/s"
+    )
+    # Sin /proc, resource ni psutil no hay medidas de memoria.
+    if row["rss_mb"] is not None:
+        line += f"  rss {row['rss_mb']:8.1f} MB"
+    if row["peak_rss_growth_mb"] is not None:
+        line += f"  pico +{row['peak_rss_growth_mb']:.1f} MB"
+    print(line)
+
+
+def _key(row):
+    return f"{row['stage']}@{row['size']}"
+
+
+def save_baseline(results, path=BASELINE_PATH):
+    """
+    Guarda los resultados correctos como la base de comparación.
+
+    Las entradas de otros tamaños o etapas que ya estaban en el archivo
+    se conservan.
+
+    Parámetros
+    ----------
+    results : list
+        Resultados de ``run_size``.
+    path : str, optional
+        Ruta del archivo de bases.
+    """
+    baseline = {"machine": {}, "stages": {}}
+    if os.path.exists(path):
+        with open(path, encoding="utf8") as f:
+            baseline = json.load(f)
+    baseline["machine"] = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpus": os.cpu_count(),
+    }
+    for row in results:
+        if row["status"] == "ok":
+            baseline["stages"][_key(row)] = {
+                "wall_seconds": row["wall_seconds"],
+                "items_per_second": row["items_per_second"],
+                "peak_rss_growth_mb": row["peak_rss_growth_mb"],
+                "saved_at": time.time(),
+            }
+    with open(path, "w", encoding="utf8") as f:
+        json.dump(baseline, f, ensure_ascii=False, indent=1, sort_keys=True)
+
+
+def compare_baseline(results, path=BASELINE_PATH, tolerance=TOLERANCE):
+    """
+    Compara los resultados con la base guardada.
+
+    Parámetros
+    ----------
+    results : list
+        Resultados de ``run_size``.
+    path : str, optional
+        Ruta del archivo de bases.
+    tolerance : float, optional
+        Aumento relativo del tiempo que se acepta.
+
+    Retorna
+    -------
+    list
+        Mensajes de las etapas que empeoraron; vacía si no hay regresiones.
+        Una etapa con base que ahora falla también es una regresión; las
+        omitidas por dependencias faltantes no.
+    """
+    with open(path, encoding="utf8") as f:
+        stages = json.load(f)["stages"]
+    regressions = []
+    for row in results:
+        base = stages.get(_key(row))
+        if base is None or row["status"].startswith("omitida"):
+            continue
+        if row["status"] != "ok":
+            regressions.append(f"{_key(row)}: {row['status']}")
+            continue
+        if max(row["wall_seconds"], base["wall_seconds"]) < MIN_COMPARABLE_SECONDS:
+            continue
+        ratio = row["wall_seconds"] / base["wall_seconds"]
+        if ratio > 1 + tolerance:
+            regressions.append(
+                f"{_key(row)}: {row['wall_seconds']:.3f} s contra "
+                f"{base['wall_seconds']:.3f} s de la base ({ratio:.2f}x)"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tamanos", type=int, nargs="+", default=SIZES, help="número de tweets")
+    parser.add_argument("--etapas", nargs="+", choices=STAGES, default=STAGES, help="etapas a medir")
+    parser.add_argument(
+        "--motor", choices=plot_tools.REPORT_ENGINES, default="reportlab", help="motor de los reportes PDF"
+    )
+    parser.add_argument("--semilla", type=int, default=0, help="semilla de los tweets")
+    parser.add_argument("--json", help="guardar los resultados en este archivo")
+    parser.add_argument("--base", default=BASELINE_PATH, help="archivo de bases")
+    parser.add_argument("--guardar-base", action="store_true", help="guardar los resultados como base")
+    parser.add_argument("--comparar", action="store_true", help="comparar con la base")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCE, help="aumento de tiempo aceptado")
+    args = parser.parse_args()
+    args.base = os.path.abspath(args.base)
+    if args.comparar and not os.path.exists(args.base):
+        # Se revisa antes de medir para no esperar a que termine la corrida.
+        print(f"No existe el archivo de bases {args.base}; créalo con --guardar-base.")
+        sys.exit(2)
+
+    # Los reportes usan rutas relativas a la raíz del repositorio.
+    os.chdir(ROOT)
+    if set(args.etapas) & {"palabras_clave", "sentimientos"}:
+        try:
+            with profile_tools.stage("carga_modelos") as record:
+                model_tools.preload_models(
+                    [model_tools.SPACY_MODEL, sentiment_tools.model_name()]
+                )
+        except ImportError as error:
+            print(f"modelos no disponibles ({error})")
+        else:
+            print(f"modelos cargados en {record['wall_seconds']:.2f} s")
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.tamanos:
+            results.extend(run_size(size, args.etapas, directory, args.motor, args.semilla))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=1)
+    if args.comparar:
+        regressions = compare_baseline(results, args.base, args.tolerancia)
+        for message in regressions:
+            print(f"REGRESIÓN {message}")
+        if regressions:
+            sys.exit(1)
+        print("sin regresiones")
+    if args.guardar_base:
+        save_baseline(results, args.base)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Compara los motores del modelo de sentimientos.
+
+Exporta el modelo a ONNX si aún no existe, revisa que las etiquetas del
+motor ONNX coincidan con las de PyTorch en el conjunto fijo de frases
+(``data/sentimiento_eval_es.txt``) y mide cuántas frases por segundo
+procesa cada motor. Termina con código 1 si la coincidencia es menor que
+``sentiment_tools.MIN_AGREEMENT``.
+
+Uso::
+
+    python benchmarks/sentiment_backends.py
+    python benchmarks/sentiment_backends.py --motor onnx --repeticiones 20 --exportar
+"""
+
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import sentiment_tools  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--motor", choices=sentiment_tools.BACKENDS[1:], default="onnx-int8", help="motor a evaluar")
+    parser.add_argument("--repeticiones", type=int, default=10, help="veces que se repite el conjunto al medir velocidad")
+    parser.add_argument("--hilos", type=int, help="hilos del modelo")
+    parser.add_argument("--exportar", action="store_true", help="volver a exportar el modelo ONNX")
+    args = parser.parse_args()
+
+    os.chdir(ROOT)
+    path = os.path.join(sentiment_tools.ONNX_MODEL_DIR, sentiment_tools.ONNX_MODEL_FILES[args.motor])
+    if args.exportar or not os.path.exists(path):
+        for backend, exported in sentiment_tools.export_onnx().items():
+            print(f"{backend}: {exported} ({os.path.getsize(exported) / 2**20:.1f} MB)")
+    if args.hilos:
+        for backend in ("torch", args.motor):
+            sentiment_tools.set_num_threads(args.hilos, backend)
+
+    sentences = sentiment_tools.load_eval_set()
+    report = sentiment_tools.check_agreement(sentences, backend=args.motor)
+    print(
+        f"coincidencia {report['agreement']:.1%} en {report['sentences']} frases "
+        f"(diferencia de probabilidad máx. {report['max_proba_diff']:.3f}, "
+        f"promedio {report['mean_proba_diff']:.4f})"
+    )
+    for item in report["disagreements"]:
+        print(f"  torch={item['torch']} {args.motor}={item[args.motor]}  {item['sentence']}")
+
+    speed = sentiment_tools.check_agreement(sentences * args.repeticiones, backend=args.motor)
+    total = speed["sentences"]
+    for backend, seconds in speed["seconds"].items():
+        print(f"{backend:<10} {total / seconds:8.1f} frases/s")
+    print(f"aceleración {speed['seconds']['torch'] / speed['seconds'][args.motor]:.2f}x")
+    if not report["accepted"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Mide el tiempo de arranque de los módulos del pipeline.
+
+Cada módulo se importa en un intérprete nuevo varias veces y se reporta
+el tiempo mínimo y la mediana, los módulos que más tardan en importarse
+según ``python -X importtime`` y cualquier dependencia pesada que se
+haya cargado durante la importación (no debería haber ninguna).
+
+Uso::
+
+    python benchmarks/startup.py
+    python benchmarks/startup.py --repeat 20 --json arranque.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = ("main", "text_tools", "plot_tools")
+HEAVY_MODULES = (
+    "matplotlib",
+    "nltk",
+    "pandas",
+    "pdfkit",
+    "pyarrow",
+    "pysentimiento",
+    "reportlab",
+    "spacy",
+    "torch",
+    "twitter_scraper_selenium",
+    "wordcloud",
+)
+
+
+def _run(code, *options):
+    return subprocess.run(
+        [sys.executable, *options, "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def time_import(module, repeat):
+    """
+    Mide cuánto tarda un intérprete nuevo en importar un módulo.
+
+    Parámetros
+    ----------
+    module : str
+        Nombre del módulo.
+    repeat : int
+        Número de mediciones.
+
+    Retorna
+    -------
+    dict
+        Tiempo mínimo y mediana en segundos, incluido el arranque del
+        intérprete, y el tiempo de un intérprete vacío como referencia.
+    """
+    samples = []
+    baseline = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        _run("pass")
+        baseline.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        _run(f"import {module}")
+        samples.append(time.perf_counter() - start)
+    return {
+        "min_seconds": min(samples),
+        "median_seconds": statistics.median(samples),
+        "interpreter_seconds": statistics.median(baseline),
+    }
+
+
+def slowest_imports(module, limit):
+    """
+    Obtiene los módulos que más tardan en importarse.
+
+    Parámetros
+    ----------
+    module : str
+        Módulo a importar.
+    limit : int
+        Número de módulos a reportar.
+
+    Retorna
+    -------
+    list
+        ``(módulo, microsegundos acumulados)`` en orden descendente.
+    """
+    stderr = _run(f"import {module}", "-X", "importtime").stderr
+    times = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        if cumulative.strip().isdigit():
+            times.append((name.strip(), int(cumulative)))
+    times.sort(key=lambda item: item[1], reverse=True)
+    return times[:limit]
+
+
+def loaded_heavy_modules(module):
+    """
+    Lista las dependencias pesadas que carga la importación de un módulo.
+
+    Parámetros
+    ----------
+    module : str
+        Módulo a importar.
+
+    Retorna
+    -------
+    list
+        Nombres de ``HEAVY_MODULES`` presentes en ``sys.modules``.
+    """
+    code = (
+        f"import sys, json, {module}; "
+        f"print(json.dumps([m for m in {list(HEAVY_MODULES)!r} if m in sys.modules]))"
+    )
+    return json.loads(_run(code).stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10, help="mediciones por módulo")
+    parser.add_argument("--top", type=int, default=10, help="importaciones más lentas a mostrar")
+    parser.add_argument("--json", help="guardar los resultados en este archivo")
+    args = parser.parse_args()
+
+    results = {}
+    for module in MODULES:
+        result = time_import(module, args.repeat)
+        result["heavy_modules"] = loaded_heavy_modules(module)
+        result["slowest_imports"] = slowest_imports(module, args.top)
+        results[module] = result
+        print(
+            f"{module}: mín {result['min_seconds'] * 1000:.0f} ms, "
+            f"mediana {result['median_seconds'] * 1000:.0f} ms "
+            f"(intérprete {result['interpreter_seconds'] * 1000:.0f} ms)"
+        )
+        if result["heavy_modules"]:
+            print(f"  dependencias pesadas cargadas: {', '.join(result['heavy_modules'])}")
+        for name, microseconds in result["slowest_imports"]:
+            print(f"  {microseconds / 1000:8.1f} ms  {name}")
+    if args.json:
+        with open(args.json, "w", encoding="utf8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+Genera archivos de descarga sintéticos con tweets en español.
+
+El archivo tiene la misma forma que el que escribe
+``scrape_keyword_with_api`` y que lee ``tweet_tools.iter_tweets``::
+
+    {"<id>": {"tweet_url": ..., "tweet_details": {"full_text": ..., ...},
+              "user_details": {...}}, ...}
+
+Los tweets combinan un vocabulario de temas políticos y cotidianos con
+hashtags, menciones, enlaces, emojis, saltos de línea y una proporción
+de retweets repetidos, de modo que los analizadores trabajen con frases
+parecidas a las reales. Con la misma semilla el archivo es idéntico.
+
+Uso::
+
+    python benchmarks/synthetic_tweets.py 10000 tweets_10k.json
+"""
+
+import argparse
+import json
+import random
+from datetime import datetime, timedelta
+
+# Identificador del primer tweet; los siguientes son crecientes, como los
+# identificadores de Twitter.
+FIRST_TWEET_ID = 1_600_000_000_000_000_000
+DUPLICATE_RATE = 0.2
+MULTILINE_RATE = 0.3
+
+SUBJECTS = (
+    "La reforma",
+    "El gobierno",
+    "La oposición",
+    "El presidente",
+    "La nueva ley",
+    "El Congreso",
+    "La propuesta electoral",
+    "El Senado",
+    "La ciudadanía",
+    "El instituto electoral",
+    "Mi familia",
+    "La economía del país",
+    "El transporte público",
+    "La seguridad en la ciudad",
+    "El precio de la gasolina",
+)
+VERBS = (
+    "afecta",
+    "beneficia",
+    "preocupa a",
+    "divide a",
+    "protege a",
+    "ignora a",
+    "transforma",
+    "pone en riesgo a",
+    "fortalece a",
+    "perjudica a",
+)
+OBJECTS = (
+    "la democracia",
+    "los trabajadores",
+    "las instituciones",
+    "los estudiantes",
+    "la economía",
+    "las familias mexicanas",
+    "los derechos de todos",
+    "el futuro del país",
+    "la libertad de expresión",
+    "los pequeños negocios",
+)
+OPINIONS = (
+    "Estoy completamente de acuerdo.",
+    "No puedo creer lo que está pasando.",
+    "Es una vergüenza para todos.",
+    "Por fin una buena noticia.",
+    "Hay que informarse antes de opinar.",
+    "¿Alguien más piensa lo mismo?",
+    "Esto no va a terminar bien.",
+    "Excelente decisión, así se hace.",
+    "Qué tristeza ver esto.",
+    "Veremos qué pasa mañana.",
+)
+HASHTAGS = ("#Reforma", "#PlanB", "#México", "#Elecciones", "#INE", "#Noticias")
+MENTIONS = ("@usuario1", "@periodista", "@diputada", "@noticiero", "@vecino_mx")
+EMOJIS = ("😡", "👏", "😂", "🙏", "🇲🇽", "💔", "🔥")
+
+
+def _sentence(rng):
+    text = f"{rng.choice(SUBJECTS)} {rng.choice(VERBS)} {rng.choice(OBJECTS)}"
+    if rng.random() < 0.5:
+        text += f" {rng.choice(OPINIONS)}"
+    return text
+
+
+def make_tweet_text(rng):
+    """
+    Crea el texto de un tweet sintético.
+
+    Parámetros
+    ----------
+    rng : random.Random
+        Generador de números aleatorios.
+
+    Retorna
+    -------
+    str
+        El texto del tweet.
+    """
+    lines = [_sentence(rng)]
+    if rng.random() < MULTILINE_RATE:
+        lines.append(_sentence(rng))
+    extras = []
+    if rng.random() < 0.4:
+        extras.append(rng.choice(MENTIONS))
+    if rng.random() < 0.6:
+        extras.extend(rng.sample(HASHTAGS, rng.randint(1, 2)))
+    if rng.random() < 0.3:
+        extras.append(rng.choice(EMOJIS))
+    if rng.random() < 0.2:
+        extras.append(f"https://t.co/{rng.getrandbits(40):010x}")
+    if extras:
+        lines[-1] = f"{lines[-1]} {' '.join(extras)}"
+    return "\n".join(lines)
+
+
+def iter_records(count, seed=0, start=datetime(2023, 1, 1)):
+    """
+    Genera los registros de un archivo de descarga.
+
+    Parámetros
+    ----------
+    count : int
+        Número de tweets.
+    seed : int, optional
+        Semilla del generador.
+    start : datetime, optional
+        Fecha del primer tweet.
+
+    Retorna
+    -------
+    generator
+        Tuplas ``(id, registro)`` en orden creciente de ``id``.
+    """
+    rng = random.Random(seed)
+    recent = []
+    for index in range(count):
+        tweet_id = str(FIRST_TWEET_ID + index * 1000 + rng.randrange(1000))
+        if recent and rng.random() < DUPLICATE_RATE:
+            text = f"RT {rng.choice(MENTIONS)}: {rng.choice(recent)}"
+        else:
+            text = make_tweet_text(rng)
+            recent.append(text)
+            if len(recent) > 100:
+                recent.pop(0)
+        created_at = start + timedelta(seconds=index * 7)
+        user = f"usuario_{rng.randrange(max(count // 10, 1))}"
+        yield tweet_id, {
+            "tweet_url": f"https://twitter.com/{user}/status/{tweet_id}",
+            "tweet_details": {
+                "created_at": created_at.strftime("%a %b %d %H:%M:%S +0000 %Y"),
+                "id_str": tweet_id,
+                "full_text": text,
+                "lang": "es",
+                "retweet_count": rng.randrange(500),
+                "favorite_count": rng.randrange(2000),
+            },
+            "user_details": {
+                "screen_name": user,
+                "followers_count": rng.randrange(100_000),
+            },
+        }
+
+
+def write_scrape_file(path, count, seed=0):
+    """
+    Escribe un archivo de descarga sintético.
+
+    Los registros se escriben uno por uno, así que la memoria no depende
+    del número de tweets. Se usan escapes ASCII, igual que ``json.dump``
+    en el scraper, para que el archivo se lea bien en ``latin1``.
+
+    Parámetros
+    ----------
+    path : str
+        Ruta del archivo JSON.
+    count : int
+        Número de tweets.
+    seed : int, optional
+        Semilla del generador.
+
+    Retorna
+    -------
+    str
+        La ruta del archivo.
+    """
+    with open(path, "w", encoding="ascii") as f:
+        f.write("{")
+        for index, (tweet_id, record) in enumerate(iter_records(count, seed)):
+            if index:
+                f.write(", ")
+            f.write(f"{json.dumps(tweet_id)}: {json.dumps(record)}")
+        f.write("}")
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("count", type=int, help="número de tweets")
+    parser.add_argument("path", help="archivo JSON de salida")
+    parser.add_argument("--semilla", type=int, default=0, help="semilla del generador")
+    args = parser.parse_args()
+    write_scrape_file(args.path, args.count, args.semilla)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,342 @@
+import hashlib
+import itertools
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import deque
+
+DEFAULT_CACHE_PATH = "./cache/resultados.sqlite3"
+DEFAULT_MAX_ENTRIES = 1_000_000
+# Segundos que una conexión espera a que otro proceso libere la base
+# antes de fallar con "database is locked".
+DEFAULT_TIMEOUT = 30.0
+# Frases que ``cached_iter`` consulta y calcula a la vez.
+DEFAULT_CHUNK_SIZE = 1024
+
+
+def normalize_sentence(sentence):
+    """
+    Normaliza una frase para usarla como llave del caché.
+
+    Unifica la forma Unicode y los espacios en blanco para que la misma
+    frase copiada en distintos tweets produzca la misma llave.
+
+    Parámetros
+    ----------
+    sentence : str
+        La frase a normalizar.
+
+    Retorna
+    -------
+    str
+        La frase normalizada.
+    """
+    return " ".join(unicodedata.normalize("NFC", sentence).split())
+
+
+def sentence_key(sentence):
+    """
+    Obtiene el hash de contenido de una frase.
+
+    Parámetros
+    ----------
+    sentence : str
+        La frase.
+
+    Retorna
+    -------
+    str
+        Hash SHA-1 en hexadecimal de la frase normalizada.
+    """
+    return hashlib.sha1(normalize_sentence(sentence).encode("utf8")).hexdigest()
+
+
+class ResultCache:
+    """
+    Caché en disco de resultados por frase.
+
+    Guarda en SQLite el resultado de cada analizador por frase, indexado
+    por el hash del texto normalizado y la versión del modelo, para que
+    las frases repetidas entre temas o entre ejecuciones no vuelvan a
+    pasar por los modelos. Cuando se rebasa ``max_entries`` se eliminan
+    las entradas usadas hace más tiempo.
+
+    Parámetros
+    ----------
+    path : str, optional
+        Ruta del archivo SQLite.
+    max_entries : int, optional
+        Número máximo de entradas que se conservan.
+    timeout : float, optional
+        Segundos de espera cuando otro proceso está escribiendo; cada
+        proceso de análisis abre su propia conexión al mismo archivo.
+    """
+
+    def __init__(
+        self, path=DEFAULT_CACHE_PATH, max_entries=DEFAULT_MAX_ENTRIES, timeout=DEFAULT_TIMEOUT
+    ):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=timeout, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS resultados (
+                analyzer TEXT NOT NULL,
+                version TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (analyzer, version, key)
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_last_access ON resultados (last_access)"
+        )
+        self._conn.commit()
+        # Cota del número de entradas: sólo al rebasar ``max_entries`` se
+        # cuentan de verdad, en lugar de contar en cada escritura.
+        (self._entries,) = self._conn.execute(
+            "SELECT COUNT(*) FROM resultados"
+        ).fetchone()
+
+    def get_many(self, analyzer, version, sentences):
+        """
+        Busca en el caché los resultados de varias frases.
+
+        Parámetros
+        ----------
+        analyzer : str
+            Nombre del analizador (por ejemplo ``"sentiment"``).
+        version : str
+            Versión del modelo que produjo los resultados.
+        sentences : list
+            Frases a buscar.
+
+        Retorna
+        -------
+        dict
+            Diccionario ``índice de la frase -> resultado`` con los
+            aciertos; las frases ausentes no aparecen.
+        """
+        keys = [sentence_key(sentence) for sentence in sentences]
+        found = {}
+        with self._lock:
+            unique_keys = list(dict.fromkeys(keys))
+            for start in range(0, len(unique_keys), 500):
+                chunk = unique_keys[start : start + 500]
+                rows = self._conn.execute(
+                    "SELECT key, value FROM resultados WHERE analyzer = ? "
+                    f"AND version = ? AND key IN ({','.join('?' * len(chunk))})",
+                    [analyzer, version, *chunk],
+                ).fetchall()
+                found.update(rows)
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE resultados SET last_access = ? WHERE analyzer = ? "
+                    "AND version = ? AND key = ?",
+                    [(now, analyzer, version, key) for key in found],
+                )
+                self._conn.commit()
+        results = {}
+        for index, key in enumerate(keys):
+            if key in found:
+                results[index] = json.loads(found[key])
+        self.hits += len(results)
+        self.misses += len(keys) - len(results)
+        return results
+
+    def put_many(self, analyzer, version, items):
+        """
+        Guarda en el caché los resultados de varias frases.
+
+        Parámetros
+        ----------
+        analyzer : str
+            Nombre del analizador.
+        version : str
+            Versión del modelo que produjo los resultados.
+        items : iterable
+            Pares ``(frase, resultado)``; el resultado debe poder
+            convertirse a JSON.
+        """
+        now = time.time()
+        rows = [
+            (analyzer, version, sentence_key(sentence), json.dumps(value), now)
+            for sentence, value in items
+        ]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO resultados VALUES (?, ?, ?, ?, ?)", rows
+            )
+            self._entries += len(rows)
+            if self._entries > self.max_entries:
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        (entries,) = self._conn.execute("SELECT COUNT(*) FROM resultados").fetchone()
+        excess = entries - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM resultados WHERE rowid IN (SELECT rowid FROM "
+                "resultados ORDER BY last_access LIMIT ?)",
+                (excess,),
+            )
+        self._entries = min(entries, self.max_entries)
+
+    def stats(self):
+        """
+        Reporta el uso del caché.
+
+        Retorna
+        -------
+        dict
+            Aciertos, fallos y número de entradas guardadas.
+        """
+        with self._lock:
+            (entries,) = self._conn.execute(
+                "SELECT COUNT(*) FROM resultados"
+            ).fetchone()
+        return {"hits": self.hits, "misses": self.misses, "entries": entries}
+
+    def close(self):
+        """
+        Cierra la conexión con el archivo del caché.
+        """
+        with self._lock:
+            self._conn.close()
+
+
+def cached_map(cache, analyzer, version, sentences, compute):
+    """
+    Aplica un analizador a varias frases consultando primero el caché.
+
+    Sólo las frases que no están en el caché se envían a ``compute`` y
+    sus resultados se guardan para las siguientes ejecuciones.
+
+    Parámetros
+    ----------
+    cache : ResultCache or None
+        Caché a consultar. Si es ``None`` se calcula todo.
+    analyzer : str
+        Nombre del analizador.
+    version : str
+        Versión del modelo.
+    sentences : list
+        Frases a analizar.
+    compute : callable
+        Función que recibe una lista de frases y regresa la lista de
+        resultados en el mismo orden.
+
+    Retorna
+    -------
+    list
+        Resultado de cada frase, en el orden original.
+    """
+    if cache is None:
+        return list(compute(sentences))
+    results = [None] * len(sentences)
+    hits = cache.get_many(analyzer, version, sentences)
+    for index, value in hits.items():
+        results[index] = value
+    missing = [index for index in range(len(sentences)) if index not in hits]
+    if missing:
+        computed = list(compute([sentences[index] for index in missing]))
+        for index, value in zip(missing, computed):
+            results[index] = value
+        cache.put_many(
+            analyzer,
+            version,
+            ((sentences[index], value) for index, value in zip(missing, computed)),
+        )
+    return results
+
+
+def cached_iter(cache, analyzer, version, sentences, compute, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Aplica un analizador a un flujo de frases consultando primero el caché.
+
+    Igual que ``cached_map``, pero consulta el caché por bloques de
+    ``chunk_size`` frases y genera los resultados conforme se calculan,
+    de modo que en memoria sólo están los bloques en curso y no la lista
+    completa de resultados. Las frases ausentes de todos los bloques
+    pasan por una sola llamada a ``compute`` que las recibe como flujo,
+    así que un ``nlp.pipe`` (y sus procesos) se inicia una sola vez.
+
+    Parámetros
+    ----------
+    cache : ResultCache or None
+        Caché a consultar. Si es ``None`` se calcula todo.
+    analyzer : str
+        Nombre del analizador.
+    version : str
+        Versión del modelo.
+    sentences : iterable
+        Frases a analizar.
+    compute : callable
+        Función que recibe un iterable de frases y genera sus resultados
+        en el mismo orden, consumiendo las frases conforme las necesita.
+    chunk_size : int, optional
+        Número de frases por bloque.
+
+    Retorna
+    -------
+    generator
+        Resultado de cada frase, en el orden original.
+
+    Véase También
+    -------------
+    cached_map : Aplica un analizador a varias frases consultando primero el caché.
+    """
+    if cache is None:
+        yield from compute(sentences)
+        return
+    sentences = iter(sentences)
+    # Bloques consultados cuyos resultados aún no se generan y frases
+    # que faltan por enviar a ``compute``; ``compute`` puede pedir frases
+    # de bloques posteriores antes de entregar sus resultados.
+    chunks = deque()
+    missing = deque()
+
+    def load():
+        chunk = list(itertools.islice(sentences, chunk_size))
+        if not chunk:
+            return False
+        hits = cache.get_many(analyzer, version, chunk)
+        chunks.append((chunk, hits))
+        missing.extend(
+            sentence for index, sentence in enumerate(chunk) if index not in hits
+        )
+        return True
+
+    def pending():
+        while missing or load():
+            if missing:
+                yield missing.popleft()
+
+    computed = iter(compute(pending()))
+    while chunks or load():
+        chunk, hits = chunks.popleft()
+        new = []
+        for index, sentence in enumerate(chunk):
+            if index in hits:
+                yield hits[index]
+            else:
+                value = next(computed)
+                new.append((sentence, value))
+                yield value
+        cache.put_many(analyzer, version, new)
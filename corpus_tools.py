@@ -0,0 +1,324 @@
+import hashlib
+import os
+import re
+from array import array
+from collections import Counter
+from functools import lru_cache
+
+import cache_tools
+
+# Lista de palabras vacías en español de NLTK (``stopwords.words("spanish")``),
+# incluida en el repositorio para no descargarla en cada ejecución.
+STOPWORDS_PATH = os.path.join(os.path.dirname(__file__), "data", "stopwords_es.txt")
+EXTRA_STOPWORDS = ("http", "https")
+# Misma expresión con la que ``wordcloud`` separa un texto en palabras.
+TOKEN_PATTERN = re.compile(r"\w[\w']*")
+
+
+def _decode(data):
+    # "surrogatepass" conserva los sustitutos sueltos que a veces trae
+    # el JSON de los tweets.
+    return data.decode("utf8", "surrogatepass")
+
+
+class SentenceView:
+    """
+    Secuencia de frases de un ``Corpus`` sin copiarlas.
+
+    Cada frase se obtiene del ``buffer`` del corpus al pedirla, así que
+    recorrer la vista no guarda todas las frases en memoria. Acepta
+    índices, rebanadas (que sí regresan una lista), ``len`` e iteración.
+
+    Parámetros
+    ----------
+    corpus : Corpus
+        El corpus dueño de las frases.
+    indices : sequence
+        Índice en el corpus de cada frase de la vista.
+    """
+
+    def __init__(self, corpus, indices):
+        self.corpus = corpus
+        self.indices = indices
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.corpus[position] for position in self.indices[index]]
+        return self.corpus[self.indices[index]]
+
+    def __iter__(self):
+        corpus = self.corpus
+        for position in self.indices:
+            yield corpus[position]
+
+
+class Corpus:
+    """
+    Frases de un conjunto de documentos, separadas una sola vez.
+
+    Todas las frases se guardan en un solo bloque de bytes UTF-8
+    (``buffer``) unidas por saltos de línea, junto con la posición de
+    inicio y fin de cada una,
+    para que los analizadores de ``text_tools`` compartan la misma
+    separación sin volver a recorrer ni copiar el texto completo.
+    También guarda a qué frase única corresponde cada frase y cuántas
+    veces se repite cada una, para que los modelos sólo procesen una vez
+    los retweets y mensajes copiados. La frecuencia de palabras de la
+    nube de palabras también se calcula una sola vez, a partir de las
+    frases únicas.
+
+    Atributos
+    ---------
+    buffer : bytearray
+        Las frases en UTF-8 unidas por ``b"\\n"``; ocupa un byte por
+        carácter en la mayoría de los textos en español, aunque alguno
+        tenga emojis.
+    starts : array
+        Posición (en bytes) de inicio de cada frase en ``buffer``.
+    ends : array
+        Posición (en bytes) final, exclusiva, de cada frase en ``buffer``.
+    unique : array
+        Índice de la primera aparición de cada frase única.
+    unique_ids : array
+        Para cada frase, su posición dentro de ``unique``.
+    weights : array
+        Número de veces que aparece cada frase única.
+    """
+
+    def __init__(self, buffer, starts, ends, unique, unique_ids, weights):
+        self.buffer = buffer
+        self.starts = starts
+        self.ends = ends
+        self.unique = unique
+        self.unique_ids = unique_ids
+        self.weights = weights
+        self._token_frequencies = None
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __getitem__(self, index):
+        return _decode(self.buffer[self.starts[index] : self.ends[index]])
+
+    def __iter__(self):
+        buffer = self.buffer
+        for start, end in zip(self.starts, self.ends):
+            yield _decode(buffer[start:end])
+
+    @property
+    def sentences(self):
+        """
+        Frases del corpus, sin copiarlas.
+
+        Retorna
+        -------
+        SentenceView
+            Las frases en su orden original.
+        """
+        return SentenceView(self, range(len(self)))
+
+    @property
+    def unique_sentences(self):
+        """
+        Frases sin repetir, en orden de primera aparición, sin copiarlas.
+
+        Retorna
+        -------
+        SentenceView
+            Las frases únicas.
+        """
+        return SentenceView(self, self.unique)
+
+    @property
+    def token_frequencies(self):
+        """
+        Frecuencia de cada palabra del corpus, calculada una sola vez.
+
+        Cada frase única se separa en palabras una vez y sus conteos se
+        multiplican por el número de veces que se repite. Las palabras se
+        pasan a minúsculas y se omiten los números y las palabras vacías.
+
+        Retorna
+        -------
+        collections.Counter
+            Número de apariciones de cada palabra.
+
+        Véase También
+        -------------
+        load_stopwords : Carga las palabras vacías en español.
+        """
+        if self._token_frequencies is None:
+            stopwords = load_stopwords()
+            frequencies = Counter()
+            for sentence, weight in zip(self.unique_sentences, self.weights):
+                for token in TOKEN_PATTERN.findall(sentence.lower()):
+                    if not token.isdigit() and token not in stopwords:
+                        frequencies[token] += weight
+            self._token_frequencies = frequencies
+        return self._token_frequencies
+
+    def expand(self, unique_values):
+        """
+        Repite los resultados de las frases únicas para todas las frases.
+
+        Parámetros
+        ----------
+        unique_values : list
+            Un resultado por cada frase de ``unique_sentences``.
+
+        Retorna
+        -------
+        list
+            Un resultado por cada frase del corpus, en su orden original.
+        """
+        return [unique_values[unique_id] for unique_id in self.unique_ids]
+
+    def normalized(self, index):
+        """
+        Obtiene el texto normalizado de una frase.
+
+        Parámetros
+        ----------
+        index : int
+            Índice de la frase.
+
+        Retorna
+        -------
+        str
+            La frase normalizada.
+
+        Véase También
+        -------------
+        cache_tools.normalize_sentence : Normaliza una frase.
+        """
+        return cache_tools.normalize_sentence(self[index])
+
+
+@lru_cache(maxsize=None)
+def load_stopwords(path=STOPWORDS_PATH):
+    """
+    Carga las palabras vacías en español.
+
+    El archivo tiene una palabra por línea; se lee una sola vez por
+    proceso.
+
+    Parámetros
+    ----------
+    path : str, optional
+        Ruta del archivo de palabras vacías.
+
+    Retorna
+    -------
+    frozenset
+        Las palabras vacías, más ``EXTRA_STOPWORDS``.
+    """
+    with open(path, encoding="utf8") as f:
+        words = {line.strip() for line in f if line.strip()}
+    return frozenset(words.union(EXTRA_STOPWORDS))
+
+
+def split_sentences(text):
+    """
+    Separa el texto en frases.
+
+    Cada línea no vacía se considera una frase. Si se recibe un iterable
+    de documentos (por ejemplo, el texto de cada tweet) cada documento se
+    separa por su cuenta, de modo que dos tweets nunca se unen en la
+    misma frase.
+
+    Parámetros
+    ----------
+    text : str or iterable
+        El texto o los documentos a separar.
+
+    Retorna
+    -------
+    generator
+        Las frases encontradas.
+
+    Véase También
+    -------------
+    string.split : Separa un string en varios segmentos por medio de un token.
+    string.strip : Eliminar los espacios al principio y al final del string.
+    """
+    if isinstance(text, str):
+        text = [text]
+    for document in text:
+        for line in document.split("\n"):
+            if line.strip():
+                yield line
+
+
+def build_corpus(text):
+    """
+    Separa y normaliza un texto una sola vez.
+
+    Las frases se escriben en el ``buffer`` a medida que se leen y las
+    repetidas se detectan por un hash de su texto, así que durante la
+    construcción no se guarda ninguna otra copia de las frases.
+
+    Parámetros
+    ----------
+    text : str or iterable
+        El texto o los documentos a preparar; puede ser un generador,
+        por ejemplo ``tweet_tools.iter_documents``.
+
+    Retorna
+    -------
+    Corpus
+        Las frases listas para los analizadores de ``text_tools``.
+
+    Véase También
+    -------------
+    split_sentences : Separa el texto en frases.
+    """
+    buffer = bytearray()
+    starts = array("L")
+    ends = array("L")
+    unique = array("L")
+    unique_ids = array("L")
+    weights = array("L")
+    seen = {}
+    position = 0
+    for index, sentence in enumerate(split_sentences(text)):
+        data = sentence.encode("utf8", "surrogatepass")
+        if index:
+            buffer += b"\n"
+            position += 1
+        buffer += data
+        starts.append(position)
+        position += len(data)
+        ends.append(position)
+        # Se compara el texto exacto: normalizarlo podría cambiar la
+        # predicción del modelo y con ello los resultados agregados.
+        digest = hashlib.blake2b(data, digest_size=16).digest()
+        unique_id = seen.get(digest)
+        if unique_id is None:
+            unique_id = seen[digest] = len(unique)
+            unique.append(index)
+            weights.append(0)
+        weights[unique_id] += 1
+        unique_ids.append(unique_id)
+    return Corpus(buffer, starts, ends, unique, unique_ids, weights)
+
+
+def as_corpus(text):
+    """
+    Convierte la entrada de un analizador en un ``Corpus``.
+
+    Parámetros
+    ----------
+    text : str, iterable or Corpus
+        El texto, los documentos o un corpus ya preparado.
+
+    Retorna
+    -------
+    Corpus
+        El mismo corpus si ya lo era; si no, uno nuevo.
+    """
+    if isinstance(text, Corpus):
+        return text
+    return build_corpus(text)
@@ -1,4 +1,126 @@
-def make_log_control(message):
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+from datetime import datetime, timezone
+
+LOG_PATH = "./logs.jsonl"
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+LOGGER_NAME = "binahria"
+
+_listener = None
+_listener_pid = None
+_lock = threading.Lock()
+
+
+class JsonLineFormatter(logging.Formatter):
+    """
+    Da formato de una línea JSON a cada registro del log.
+
+    Cada línea incluye la fecha y hora en UTC (ISO 8601), el nivel, el
+    proceso, el mensaje, y el tema y la etapa del pipeline cuando se
+    conocen.
+    """
+
+    def format(self, record):
+        data = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "pid": record.process,
+            "topic": getattr(record, "topic", None),
+            "stage": getattr(record, "stage", None),
+            "message": record.getMessage(),
+        }
+        extra = getattr(record, "data", None)
+        if extra:
+            data["data"] = extra
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+def _stop_logging():
+    global _listener, _listener_pid
+    with _lock:
+        if _listener is None or _listener_pid != os.getpid():
+            return
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        logging.getLogger(LOGGER_NAME).handlers.clear()
+        _listener = None
+        _listener_pid = None
+
+
+def setup_logging(path=LOG_PATH, max_bytes=LOG_MAX_BYTES, backup_count=LOG_BACKUP_COUNT):
+    """
+    Configura el log de control.
+
+    Los mensajes se ponen en una cola en memoria y un hilo en segundo
+    plano los escribe en el archivo, así que quien registra un mensaje
+    nunca espera al disco y las líneas de varios hilos no se mezclan.
+    El archivo rota al llegar a ``max_bytes`` y la cola se vacía al
+    terminar el programa. Llamarla de nuevo no tiene efecto.
+
+    Parámetros
+    ----------
+    path : str, optional
+        Ruta del archivo de log (una línea JSON por registro).
+    max_bytes : int, optional
+        Tamaño máximo del archivo antes de rotarlo.
+    backup_count : int, optional
+        Número de archivos rotados que se conservan.
+
+    Retorna
+    -------
+    logging.Logger
+        El logger del bot.
+
+    Véase También
+    -------------
+    logging.handlers.QueueListener : Escribe en un hilo los registros de una cola.
+    logging.handlers.RotatingFileHandler : Archivo de log que rota por tamaño.
+    """
+    global _listener, _listener_pid
+    logger = logging.getLogger(LOGGER_NAME)
+    with _lock:
+        # Un proceso hijo de ``fork`` hereda el listener pero no su hilo.
+        if _listener is not None and _listener_pid == os.getpid():
+            return logger
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        file_handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf8"
+        )
+        file_handler.setFormatter(JsonLineFormatter())
+        records = queue.SimpleQueue()
+        logger.handlers.clear()
+        logger.addHandler(logging.handlers.QueueHandler(records))
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        _listener = logging.handlers.QueueListener(records, file_handler)
+        _listener_pid = os.getpid()
+        _listener.start()
+        atexit.register(_stop_logging)
+    return logger
+
+
+def flush_logs():
+    """
+    Escribe en el archivo todos los mensajes pendientes.
+
+    Detiene el hilo de escritura después de vaciar la cola; el siguiente
+    mensaje lo vuelve a iniciar.
+    """
+    _stop_logging()
+
+
+def make_log_control(message, topic=None, stage=None, level=logging.INFO, **data):
     """
     Crea un log de control.
 
@@ -9,11 +131,18 @@ def make_log_control(message):
     ----------
     message : str
         Mensaje que describe el proceso que se ejecuta en ese momento.
-    
+    topic : str, optional
+        Tema (hashtag) al que se refiere el mensaje.
+    stage : str, optional
+        Etapa del pipeline (por ejemplo ``"descarga"`` o ``"analisis"``).
+    level : int, optional
+        Nivel de ``logging`` del mensaje.
+    **data
+        Valores adicionales que se guardan en el campo ``data``.
+
     Véase También
     -------------
-    open : Abre un archivo especifico.
+    setup_logging : Configura el log de control.
     """
-    destFile = r"./logs.txt"
-    with open(destFile, "a") as f:
-        f.write(f"{message}\r\n")
+    logger = setup_logging()
+    logger.log(level, message, extra={"topic": topic, "stage": stage, "data": data})
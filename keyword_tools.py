@@ -0,0 +1,562 @@
+import heapq
+import itertools
+from collections import deque
+
+# El montículo de ``SpaceSaving`` se reconstruye cuando sus entradas
+# obsoletas superan este múltiplo de la capacidad.
+HEAP_REBUILD_FACTOR = 4
+# ``cluster_keywords`` compara cada palabra clave sólo con los
+# representantes que comparten alguno de sus trigramas; por cada
+# trigrama se guardan a lo sumo ``MAX_BLOCK_SIZE`` representantes (los
+# primeros, que son los más frecuentes).
+BLOCK_GRAM_SIZE = 3
+MAX_BLOCK_SIZE = 32
+
+
+class KeywordIndex:
+    """
+    Índice de búsqueda simultánea de palabras clave (Aho-Corasick).
+
+    Construye una sola vez un autómata con todas las palabras clave para
+    encontrar cuáles aparecen en una frase recorriéndola una sola vez,
+    en lugar de buscar cada palabra clave por separado.
+
+    Parámetros
+    ----------
+    keywords : iterable
+        Palabras clave a indexar. Se conserva el orden de aparición.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = list(dict.fromkeys(keywords))
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+        for index, keyword in enumerate(self.keywords):
+            self._add(keyword, index)
+        self._link()
+
+    def _add(self, keyword, index):
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append(index)
+
+    def _link(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._output[next_state] += self._output[self._fail[next_state]]
+
+    def find(self, text):
+        """
+        Encuentra las palabras clave contenidas en un texto.
+
+        Parámetros
+        ----------
+        text : str
+            El texto donde se buscan las palabras clave.
+
+        Retorna
+        -------
+        set
+            Índices (en ``self.keywords``) de las palabras clave encontradas.
+        """
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        found = set()
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found.update(output[state])
+        return found
+
+    def count_sentences(self, sentences, weights=None):
+        """
+        Cuenta en cuántas frases aparece cada palabra clave.
+
+        Equivale a evaluar ``keyword in sentence`` para cada par de
+        palabra clave y frase, pero con un solo recorrido por frase.
+
+        Parámetros
+        ----------
+        sentences : iterable
+            Frases a analizar.
+        weights : iterable, optional
+            Número de veces que se repite cada frase; por defecto una.
+
+        Retorna
+        -------
+        dict
+            Diccionario ``palabra clave -> número de frases``, en el
+            orden en que se indexaron las palabras clave.
+        """
+        counts = [0] * len(self.keywords)
+        if weights is None:
+            weights = itertools.repeat(1)
+        for sentence, weight in zip(sentences, weights):
+            for index in self.find(sentence):
+                counts[index] += weight
+        return dict(zip(self.keywords, counts))
+
+
+def bounded_levenshtein(source, target, max_distance):
+    """
+    Calcula la distancia de Levenshtein con un límite máximo.
+
+    Sólo evalúa la franja de la matriz donde la distancia puede ser menor
+    o igual a ``max_distance`` y termina en cuanto se rebasa ese límite.
+
+    Parámetros
+    ----------
+    source : str
+        Primera palabra.
+    target : str
+        Segunda palabra.
+    max_distance : int
+        Distancia máxima que interesa conocer.
+
+    Retorna
+    -------
+    int
+        La distancia de edición, o ``max_distance + 1`` si es mayor al límite.
+    """
+    if len(source) > len(target):
+        source, target = target, source
+    len_source = len(source)
+    len_target = len(target)
+    if len_target - len_source > max_distance:
+        return max_distance + 1
+    if not len_source:
+        return len_target
+    limit = max_distance + 1
+    previous = [min(col, limit) for col in range(len_target + 1)]
+    for row in range(1, len_source + 1):
+        char = source[row - 1]
+        start = max(1, row - max_distance)
+        end = min(len_target, row + max_distance)
+        current = [limit] * (len_target + 1)
+        current[0] = row if row <= max_distance else limit
+        row_min = current[0]
+        for col in range(start, end + 1):
+            cost = 0 if char == target[col - 1] else 1
+            value = min(
+                previous[col] + 1,
+                current[col - 1] + 1,
+                previous[col - 1] + cost,
+            )
+            if value > limit:
+                value = limit
+            current[col] = value
+            if value < row_min:
+                row_min = value
+        if row_min > max_distance:
+            return limit
+        previous = current
+    return min(previous[len_target], limit)
+
+
+def _grams(word):
+    padded = f"^{word}$"
+    return {
+        padded[index : index + BLOCK_GRAM_SIZE]
+        for index in range(max(len(padded) - BLOCK_GRAM_SIZE + 1, 1))
+    }
+
+
+def _distance_kernel():
+    """
+    Obtiene la función de distancia de edición con límite.
+
+    Usa ``rapidfuzz`` (compilado) si está instalado y, si no,
+    ``bounded_levenshtein``; ambas retornan ``max_distance + 1`` cuando
+    la distancia rebasa el límite.
+    """
+    try:
+        from rapidfuzz.distance import Levenshtein
+    except ImportError:
+        return bounded_levenshtein
+
+    def distance(source, target, max_distance):
+        return Levenshtein.distance(source, target, score_cutoff=max_distance)
+
+    return distance
+
+
+def _max_distance(length, threshold):
+    """
+    Mayor distancia de edición con similitud mayor a ``threshold``.
+
+    La similitud es ``1 - distancia / longitud máxima``, igual que en
+    ``Levenshtein.similarity`` de ``hermetrics``. El producto
+    ``(1 - threshold) * length`` sólo da una aproximación (con 0.7 y 10
+    resulta 3.0000000000000004), así que se corrige evaluando la misma
+    comparación que usa la similitud.
+    """
+    if not length:
+        return -1
+    distance = int((1 - threshold) * length)
+    while distance >= 0 and not 1 - distance / length > threshold:
+        distance -= 1
+    while distance < length and 1 - (distance + 1) / length > threshold:
+        distance += 1
+    return distance
+
+
+def cluster_keywords(keywords_found, threshold=0.5):
+    """
+    Agrupa palabras clave casi idénticas.
+
+    Recorre las palabras clave de mayor a menor frecuencia (empates por
+    orden de aparición); cada una se une al primer representante, es
+    decir, al de mayor frecuencia, cuya similitud sea mayor a
+    ``threshold`` o se vuelve representante de un grupo nuevo.
+
+    Con umbrales como 0.5 una edición por cada dos caracteres basta para
+    superar el umbral, así que ningún filtro exacto de q-gramas o de
+    distancias descarta pares. Los candidatos se obtienen entonces por
+    bloques: los representantes que comparten un trigrama con la palabra
+    (hasta ``MAX_BLOCK_SIZE`` por trigrama) y tienen una longitud
+    compatible. Así cada palabra se compara con un número acotado de
+    representantes y el tiempo crece casi linealmente; se pierden sólo
+    coincidencias entre palabras sin ningún trigrama en común o con
+    trigramas muy repetidos. La distancia se calcula con ``rapidfuzz``
+    si está instalado.
+
+    Como en el ciclo de comparación anterior, cada palabra absorbida suma
+    uno a la frecuencia de su representante.
+
+    Parámetros
+    ----------
+    keywords_found : dict
+        Diccionario ``palabra clave -> frecuencia``.
+    threshold : float, optional
+        Similitud mínima (exclusiva) para considerar iguales dos palabras.
+
+    Retorna
+    -------
+    dict
+        Diccionario ``representante -> frecuencia``, en el orden en que
+        se crearon los grupos.
+
+    Véase También
+    -------------
+    bounded_levenshtein : Calcula la distancia de Levenshtein con un límite máximo.
+    """
+    distance = _distance_kernel()
+    items = list(keywords_found.items())
+    order = sorted(range(len(items)), key=lambda index: (-items[index][1], index))
+    leaders = []
+    merged = []
+    gram_index = {}
+    for position in order:
+        word, count = items[position]
+        length = len(word)
+        grams = _grams(word)
+        candidates = set()
+        for gram in grams:
+            members = gram_index.get(gram)
+            if members:
+                candidates.update(members)
+        best = None
+        for leader in sorted(candidates):
+            leader_word = leaders[leader]
+            max_distance = _max_distance(max(length, len(leader_word)), threshold)
+            if max_distance < 0 or abs(length - len(leader_word)) > max_distance:
+                continue
+            if distance(word, leader_word, max_distance) <= max_distance:
+                best = leader
+                break
+        if best is None:
+            leader = len(leaders)
+            leaders.append(word)
+            merged.append(count)
+            for gram in grams:
+                members = gram_index.setdefault(gram, [])
+                if len(members) < MAX_BLOCK_SIZE:
+                    members.append(leader)
+        else:
+            merged[best] += 1
+    return dict(zip(leaders, merged))
+
+
+class SpaceSaving:
+    """
+    Conteo aproximado de los elementos más frecuentes (Space-Saving).
+
+    Guarda a lo sumo ``capacity`` elementos sin importar cuántos
+    elementos distintos lleguen. Cuando llega uno nuevo y no hay lugar,
+    reemplaza al de menor conteo y hereda ese conteo como error. Con
+    ``N`` igual a la suma de todos los pesos agregados:
+
+    * el conteo de cada elemento guardado nunca es menor que el real y
+      lo excede a lo sumo en su ``error``, que es menor o igual a
+      ``N / capacity``;
+    * todo elemento cuyo conteo real supera ``N / capacity`` está
+      guardado.
+
+    Dos resúmenes pueden combinarse con ``merge`` (por ejemplo, los de
+    varios procesos o ejecuciones) y conservan las mismas garantías
+    sobre la suma de sus ``N``; ``to_dict`` y ``from_dict`` permiten
+    guardarlos en JSON.
+
+    Parámetros
+    ----------
+    capacity : int
+        Número máximo de elementos guardados.
+    """
+
+    def __init__(self, capacity):
+        if capacity < 1:
+            raise ValueError("La capacidad debe ser al menos 1")
+        self.capacity = capacity
+        self.total = 0
+        self._counts = {}
+        self._errors = {}
+        self._heap = []
+        self._sequence = itertools.count()
+
+    def __len__(self):
+        return len(self._counts)
+
+    def __contains__(self, item):
+        return item in self._counts
+
+    def _push(self, item):
+        heapq.heappush(self._heap, (self._counts[item], next(self._sequence), item))
+        if len(self._heap) > HEAP_REBUILD_FACTOR * self.capacity:
+            self._heap = [
+                (count, next(self._sequence), item)
+                for item, count in self._counts.items()
+            ]
+            heapq.heapify(self._heap)
+
+    def _clean_heap(self):
+        # Los conteos sólo crecen, así que una entrada es vigente si su
+        # conteo es el actual del elemento.
+        heap = self._heap
+        while heap and self._counts.get(heap[0][2]) != heap[0][0]:
+            heapq.heappop(heap)
+
+    @property
+    def min_count(self):
+        """
+        Conteo mínimo guardado; ``0`` si aún hay lugar.
+
+        Es la cota superior del conteo real de cualquier elemento que no
+        está guardado.
+        """
+        if len(self._counts) < self.capacity:
+            return 0
+        self._clean_heap()
+        return self._heap[0][0]
+
+    @property
+    def error_bound(self):
+        """
+        Error máximo de cualquier conteo (``N / capacity``).
+        """
+        return self.total / self.capacity
+
+    def add(self, item, weight=1):
+        """
+        Agrega las apariciones de un elemento.
+
+        Parámetros
+        ----------
+        item : hashable
+            El elemento.
+        weight : int, optional
+            Número de apariciones; debe ser positivo.
+        """
+        if weight <= 0:
+            raise ValueError("El peso debe ser positivo")
+        self.total += weight
+        counts = self._counts
+        if item in counts:
+            counts[item] += weight
+        elif len(counts) < self.capacity:
+            counts[item] = weight
+            self._errors[item] = 0
+        else:
+            self._clean_heap()
+            min_count, _, min_item = heapq.heappop(self._heap)
+            del counts[min_item]
+            del self._errors[min_item]
+            counts[item] = min_count + weight
+            self._errors[item] = min_count
+        self._push(item)
+
+    def update(self, items, weights=None):
+        """
+        Agrega varios elementos.
+
+        Parámetros
+        ----------
+        items : iterable
+            Los elementos.
+        weights : iterable, optional
+            Apariciones de cada elemento; por defecto una.
+        """
+        if weights is None:
+            weights = itertools.repeat(1)
+        for item, weight in zip(items, weights):
+            self.add(item, weight)
+
+    def estimate(self, item):
+        """
+        Estima el conteo de un elemento.
+
+        Parámetros
+        ----------
+        item : hashable
+            El elemento.
+
+        Retorna
+        -------
+        tuple
+            ``(conteo, error)``: el conteo real está entre
+            ``conteo - error`` y ``conteo``.
+        """
+        if item in self._counts:
+            return self._counts[item], self._errors[item]
+        min_count = self.min_count
+        return min_count, min_count
+
+    def top(self, k=None):
+        """
+        Obtiene los elementos de mayor conteo.
+
+        Parámetros
+        ----------
+        k : int, optional
+            Número de elementos; por defecto todos los guardados.
+
+        Retorna
+        -------
+        list
+            Tuplas ``(elemento, conteo, error)`` de mayor a menor conteo;
+            los empates conservan el orden de llegada.
+        """
+        items = sorted(self._counts.items(), key=lambda item: -item[1])
+        if k is not None:
+            items = items[:k]
+        return [(item, count, self._errors[item]) for item, count in items]
+
+    def guaranteed_top(self, k):
+        """
+        Obtiene los elementos que con certeza están entre los ``k`` mayores.
+
+        Un elemento está garantizado si su conteo mínimo posible
+        (``conteo - error``) no es menor que el conteo estimado del
+        elemento ``k + 1``.
+
+        Parámetros
+        ----------
+        k : int
+            Número de elementos buscados.
+
+        Retorna
+        -------
+        list
+            Tuplas ``(elemento, conteo, error)`` garantizadas.
+        """
+        ranked = self.top(k + 1)
+        threshold = ranked[k][1] if len(ranked) > k else self.min_count
+        return [
+            (item, count, error)
+            for item, count, error in ranked[:k]
+            if count - error >= threshold
+        ]
+
+    def merge(self, other):
+        """
+        Combina dos resúmenes.
+
+        Un elemento que falta en un resumen lleno toma el conteo mínimo
+        de ese resumen (su cota superior) tanto en el conteo como en el
+        error, así que las garantías se mantienen sobre la suma de
+        ``N``. Se conservan los ``capacity`` elementos de mayor conteo.
+
+        Parámetros
+        ----------
+        other : SpaceSaving
+            El otro resumen.
+
+        Retorna
+        -------
+        SpaceSaving
+            Un resumen nuevo con la mayor de las dos capacidades.
+        """
+        merged = SpaceSaving(max(self.capacity, other.capacity))
+        merged.total = self.total + other.total
+        self_min = self.min_count
+        other_min = other.min_count
+        combined = []
+        for item in itertools.chain(
+            self._counts, (item for item in other._counts if item not in self._counts)
+        ):
+            count = self._counts.get(item, self_min) + other._counts.get(item, other_min)
+            error = self._errors.get(item, self_min) + other._errors.get(item, other_min)
+            combined.append((item, count, error))
+        combined.sort(key=lambda entry: -entry[1])
+        for item, count, error in combined[: merged.capacity]:
+            merged._counts[item] = count
+            merged._errors[item] = error
+            merged._push(item)
+        return merged
+
+    def to_dict(self):
+        """
+        Convierte el resumen en un diccionario serializable en JSON.
+
+        Retorna
+        -------
+        dict
+            ``capacity``, ``total`` e ``items`` (``[elemento, conteo, error]``).
+        """
+        return {
+            "capacity": self.capacity,
+            "total": self.total,
+            "items": [list(entry) for entry in self.top()],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Reconstruye un resumen guardado con ``to_dict``.
+
+        Parámetros
+        ----------
+        data : dict
+            El resumen serializado.
+
+        Retorna
+        -------
+        SpaceSaving
+            El resumen.
+        """
+        sketch = cls(data["capacity"])
+        sketch.total = data["total"]
+        for item, count, error in data["items"]:
+            sketch._counts[item] = count
+            sketch._errors[item] = error
+            sketch._push(item)
+        return sketch
@@ -1,87 +1,185 @@
-from twitter_scraper_selenium import get_profile_details
-from twitter_scraper_selenium import scrape_keyword_with_api
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import datetime
-import plot_tools, text_tools
+import cache_tools, corpus_tools, deploy_tools, model_tools, plot_tools, profile_tools, readability_tools, results_store, sentiment_tools, state_tools, text_tools, tweet_tools
+import argparse
 import json
+import logging
+import multiprocessing
+import os
 import pathlib
-import pandas as pd
-import collections
-import numpy as np
-import nltk
-from nltk.corpus import stopwords
-nltk.download("stopwords")
-from wordcloud import WordCloud 
-stopwords = set(stopwords.words('spanish', 'english')) 
-import matplotlib.cm as cm
-import matplotlib.pyplot as plt
-from matplotlib import rcParams
-stopwords.update([ "http", "https"])
+import time
+
+# El scraper, pandas y los modelos se importan al usarse: importar este
+# módulo (o iniciar un proceso de análisis) no debe costar segundos ni
+# requerir red.
+
+TWEETS_COUNT = 50
+# Número de temas que se descargan al mismo tiempo.
+SCRAPE_CONCURRENCY = 4
+SCRAPE_RETRIES = 3
+SCRAPE_BACKOFF = 2.0
+# Número de procesos que analizan temas; con 1 se analiza en el proceso principal.
+ANALYSIS_WORKERS = 1
+# Las gráficas se generan en memoria y se incrustan en el reporte; con
+# True también se guardan en ./graficas.
+GUARDAR_GRAFICAS = False
+# Con un número, sólo se obtienen las PALABRAS_TOP_K palabras clave más
+# frecuentes con memoria acotada (para temas con muchísimos tweets) y el
+# acumulado del tema guarda a lo sumo PALABRAS_CAPACIDAD palabras.
+PALABRAS_TOP_K = None
+PALABRAS_CAPACIDAD = 10000
+
+_worker_cache = None
 
 # twitter_username = "LaloMedecigoMR"
 # filename = "twitter_api_data"
 # get_profile_details(twitter_username=twitter_username, filename=filename)
-df = pd.read_csv('resultados_hashtags.csv', encoding="latin1")
-mas_tuiteado = df["mas_tuiteado"].values.tolist()
-mas_duradero = df["mas_duradero"].values.tolist()
-lista_final = mas_tuiteado + mas_duradero
-lista_final = ["#Reforma", "#reforma#PlanB"]
 
-for tema in lista_final:
+
+def scrape_topic(tema, since_id=None, tweets_count=TWEETS_COUNT, retries=SCRAPE_RETRIES, backoff=SCRAPE_BACKOFF):
+    """
+    Descarga los tweets de un tema.
+
+    Reintenta la descarga con espera exponencial cuando falla.
+
+    Parámetros
+    ----------
+    tema : str
+        Hashtag a buscar.
+    since_id : str, optional
+        Último tweet procesado del tema; sólo se buscan tweets posteriores.
+    tweets_count : int, optional
+        Número de tweets a descargar.
+    retries : int, optional
+        Número de intentos.
+    backoff : float, optional
+        Segundos de espera antes del segundo intento; se duplica en cada
+        intento siguiente.
+
+    Retorna
+    -------
+    tuple
+        ``(nombre del archivo de salida, segundos de descarga)``.
+    """
+    from twitter_scraper_selenium import scrape_keyword_with_api
+
+    output_filename = f"{tema[1:]}"
+    query = tema if since_id is None else f"{tema} since_id:{since_id}"
+    with profile_tools.stage("descarga", items=tweets_count, topic=tema) as etapa:
+        for attempt in range(retries):
+            try:
+                scrape_keyword_with_api(query=query, tweets_count=tweets_count, output_filename=output_filename)
+                break
+            except Exception as error:
+                if attempt == retries - 1:
+                    raise
+                deploy_tools.make_log_control(f"reintento de descarga ({error})", topic=tema, stage="descarga")
+                time.sleep(backoff * 2 ** attempt)
+    return output_filename, etapa["wall_seconds"]
+
+
+def analyze_topic(tema, output_filename, cache=None):
+    """
+    Analiza los tweets descargados de un tema y prepara su reporte.
+
+    Sólo se analizan los tweets posteriores al último procesado; sus
+    resultados se suman al estado acumulado del tema y las gráficas del
+    reporte muestran los acumulados. El PDF no se genera aquí, sino en
+    ``run_pipeline``, y ni el estado actualizado ni los resultados del
+    ``results_store.ResultsStore`` se guardan aquí, sino hasta que el
+    reporte existe (``save_topic_results``), para que una falla
+    posterior no dé por procesados tweets cuyo reporte nunca se generó
+    ni duplique sus filas en el almacén al volver a analizarlos.
+
+    Parámetros
+    ----------
+    tema : str
+        Hashtag analizado.
+    output_filename : str
+        Nombre (sin extensión) del archivo descargado.
+    cache : cache_tools.ResultCache, optional
+        Caché de resultados por frase.
+
+    Retorna
+    -------
+    tuple
+        ``(tiempos, reporte, resultados)``: segundos empleados en cada
+        etapa del análisis, el diccionario de datos del reporte y los
+        resultados por guardar (el estado actualizado del tema y los de
+        esta ejecución); los dos últimos son ``None`` si no hubo tweets
+        nuevos.
+    """
+    timings = {}
     query = tema
-    tweets_count = 50
-    output_filename = f"{query[1:]}"
-    scrape_keyword_with_api(query=query, tweets_count=tweets_count, output_filename=output_filename)
-
-    f = open(f'{output_filename}.json', encoding="latin1")
-    try:
-        data = json.load(f)
-    except json.decoder.JSONDecodeError:
-        continue
-    f.close()
+    # Cada tweet se conserva como un documento aparte para que el texto de
+    # dos tweets no termine en la misma frase; el corpus se separa una
+    # sola vez y lo comparten todos los analizadores.
+    estado = state_tools.load_topic_state(tema)
+    with profile_tools.stage("lectura") as etapa:
+        try:
+            tweets = [
+                tweet
+                for tweet in tweet_tools.iter_tweets(f'{output_filename}.json')
+                if state_tools.is_new_tweet(estado, tweet.id)
+            ]
+        except json.decoder.JSONDecodeError:
+            return timings, None, None
+        etapa["items"] = timings["tweets_nuevos"] = len(tweets)
+        if not tweets:
+            return timings, None, None
+        contentido_texto = corpus_tools.build_corpus(tweet.full_text for tweet in tweets)
     now = datetime.now()
-    fecha = now.strftime(f"%d_%m_%Y__%H_%M_%S")
-    contentido_texto = ""
-    for index in data:
-        contentido_texto += data[index]["tweet_details"]["full_text"]
-
-    resultados_palabras = text_tools.get_frecuency_key_words(contentido_texto)
-    plot_tools.dict_to_csv(
-        fecha, resultados_palabras, "./resultados/palabras_extraidas"
-    )
-    plot_tools.dict_to_csv(
-        fecha, resultados_palabras, "./resultados/palabras_extraidas"
-    )
-    resultados_sentimientos = text_tools.get_sentiment_analyze(contentido_texto)
-    plot_tools.dict_to_csv(
-        fecha,
-        resultados_sentimientos,
-        "./resultados/sentimientos_extraidos",
-    )
-    resultados_sentimientos_detalle = text_tools.get_sentiment_detail(
-        contentido_texto
-    )
-    plot_tools.dict_to_csv(
-        fecha,
-        resultados_sentimientos_detalle,
-        "./resultados/sentimientos_extraidos_detalle",
-    )
-    resultados_flesch_Kincaid = text_tools.get_flesch_kincaid_test(contentido_texto)
-    plot_tools.list_to_csv(
-        fecha,
-        resultados_flesch_Kincaid,
-        "./resultados/resultados_flesch_Kincaid",
-    )
-    plot_tools.get_pie_chart(
-        fecha, "./graficas/sentimentos_grafica", resultados_sentimientos
-    )
-    plot_tools.get_barh_chart(
-        fecha, "./graficas/palabras_grafica", resultados_palabras
-    )
-    plot_tools.get_point_plot(
-        fecha,
-        "./graficas/flesch_kincaid_grafica",
-        resultados_flesch_Kincaid,
-    )
+    # Se agrega el tema para que los archivos de temas analizados en el
+    # mismo segundo por distintos procesos no se sobrescriban.
+    fecha = now.strftime(f"%d_%m_%Y__%H_%M_%S") + f"__{output_filename}"
+    timings["lectura"] = etapa["wall_seconds"]
+
+    with profile_tools.stage("nlp") as etapa:
+        resultados_palabras = text_tools.get_frecuency_key_words(
+            contentido_texto, cache=cache, top_k=PALABRAS_TOP_K
+        )
+        resultado_sentimientos = text_tools.get_sentiment_result(
+            contentido_texto, cache=cache
+        )
+        resultados_sentimientos = text_tools.get_sentiment_analyze(
+            contentido_texto, resultado_sentimientos
+        )
+        resultados_flesch_Kincaid = text_tools.get_flesch_kincaid_test(
+            contentido_texto, cache=cache
+        )
+        estado = state_tools.merge_results(
+            estado,
+            [tweet.id for tweet in tweets],
+            resultados_sentimientos,
+            resultados_palabras,
+            resultados_flesch_Kincaid,
+            keyword_capacity=PALABRAS_CAPACIDAD if PALABRAS_TOP_K else None,
+            token_frequencies=contentido_texto.token_frequencies,
+        )
+        historial_flesch_Kincaid = estado["readability"]["history"]
+        resumen_flesch_Kincaid = readability_tools.summarize_scores(
+            historial_flesch_Kincaid
+        )
+    timings["nlp"] = etapa["wall_seconds"]
+
+    with profile_tools.stage("graficas") as etapa:
+        formato = {"fmt": plot_tools.CHART_FORMAT, "in_memory": True}
+        carpeta = "./graficas" if GUARDAR_GRAFICAS else None
+        grafica_sentimientos, grafica_palabras, grafica_flesch_Kincaid, _ = plot_tools.render_charts([
+            (plot_tools.get_pie_chart, (fecha, carpeta and f"{carpeta}/sentimentos_grafica", estado["sentiments"]), formato),
+            (plot_tools.get_barh_chart, (fecha, carpeta and f"{carpeta}/palabras_grafica", estado["keywords"]), formato),
+            (
+                plot_tools.get_point_plot,
+                (fecha, carpeta and f"{carpeta}/flesch_kincaid_grafica", historial_flesch_Kincaid, resumen_flesch_Kincaid["rolling"]),
+                formato,
+            ),
+            # La nube de palabras, como las demás gráficas, muestra el
+            # acumulado del tema a partir de las frecuencias que el corpus
+            # de cada ejecución ya calculó.
+            (plot_tools.get_word_cloud, (fecha, tema, state_tools.cumulative_token_frequencies(estado)), {"fmt": "png"}),
+        ])
+    timings["graficas"] = etapa["wall_seconds"]
+
     # Reporte
     ruta = str(pathlib.Path(__file__).parent.absolute()).replace("\\", "/")
     data = {
@@ -91,9 +189,9 @@ for tema in lista_final:
         "autor": "UNIDAD PLANEACIÓN Y P.",
         "imagenes": [
             f"file:///{ruta}/media/Flesch_Tabla.png",
-            f"file:///{ruta}/graficas/flesch_kincaid_grafica_{fecha}.png",
-            f"file:///{ruta}/graficas/palabras_grafica_{fecha}.png",
-            f"file:///{ruta}/graficas/sentimentos_grafica_{fecha}.png",
+            grafica_flesch_Kincaid,
+            grafica_palabras,
+            grafica_sentimientos,
             f"file:///{ruta}/media/footer.png",
         ],
         "textos_imagenes": [
@@ -107,11 +205,257 @@ for tema in lista_final:
             f"10",
         ],
     }
-    plot_tools.get_report_pdf(data)
-    wordcloud = WordCloud(stopwords=stopwords, background_color="white", max_words=1000).generate(contentido_texto)
-    rcParams['figure.figsize'] = 10, 20
-    plt.imshow(wordcloud)
-    plt.axis("off")
-    # plt.show()
-    plt.savefig(f"{tema}_{fecha}.png", bbox_inches="tight")
-    plt.close()
\ No newline at end of file
+    resultados = {
+        "estado": estado,
+        "fecha": now,
+        "palabras": resultados_palabras,
+        "sentimientos": resultado_sentimientos,
+        "legibilidad": resultados_flesch_Kincaid,
+    }
+    return timings, data, resultados
+
+
+def save_topic_results(tema, resultados):
+    """
+    Guarda los resultados de un tema cuyo reporte ya existe.
+
+    Agrega los resultados de la ejecución al ``results_store.ResultsStore``
+    y guarda el estado actualizado del tema; a partir de aquí sus tweets
+    se dan por procesados.
+
+    Parámetros
+    ----------
+    tema : str
+        Hashtag analizado.
+    resultados : dict
+        Resultados que regresa ``analyze_topic``.
+    """
+    almacen = results_store.ResultsStore()
+    fecha = resultados["fecha"]
+    almacen.append_keywords(tema, fecha, resultados["palabras"])
+    almacen.append_sentiments(tema, fecha, resultados["sentimientos"])
+    almacen.append_readability(tema, fecha, resultados["legibilidad"])
+    state_tools.save_topic_state(tema, resultados["estado"])
+
+
+def init_worker(torch_threads=None, sentiment_backend=None):
+    """
+    Prepara un proceso de análisis.
+
+    Carga los modelos una sola vez por proceso y abre su propia conexión
+    al caché, de modo que cada tema que recibe el proceso ya encuentra
+    los modelos en memoria.
+
+    Parámetros
+    ----------
+    torch_threads : int, optional
+        Hilos de PyTorch (o de ONNX Runtime) por proceso, para no
+        saturar la CPU cuando varios procesos corren al mismo tiempo.
+    sentiment_backend : str, optional
+        Motor del modelo de sentimientos (``sentiment_tools.BACKENDS``).
+    """
+    global _worker_cache
+    if sentiment_backend:
+        sentiment_tools.SENTIMENT_BACKEND = sentiment_backend
+    if torch_threads:
+        sentiment_tools.set_num_threads(torch_threads)
+    model_tools.preload_models([model_tools.SPACY_MODEL, sentiment_tools.model_name()])
+    _worker_cache = cache_tools.ResultCache()
+
+
+def _analyze_in_worker(tema, output_filename):
+    with profile_tools.topic(tema):
+        tiempos, reporte, resultados = analyze_topic(tema, output_filename, _worker_cache)
+    return tiempos, reporte, resultados, profile_tools.collect()
+
+
+def _record_analysis(checkpoint, tiempos, reportes, reportes_pool, report_engine, tema, tiempos_tema, reporte, resultados):
+    tiempos[tema].update(tiempos_tema)
+    if reporte is None:
+        # Sin tweets nuevos no hay reporte ni estado que guardar.
+        checkpoint.mark_done(tema)
+        deploy_tools.make_log_control("tema terminado", topic=tema, stage="analisis", tiempos=tiempos[tema])
+    else:
+        futuro = reportes_pool.submit(plot_tools.get_topic_report_pdf, reporte, report_engine)
+        reportes[futuro] = (tema, resultados)
+    _finish_reports(checkpoint, tiempos, reportes)
+
+
+def _finish_reports(checkpoint, tiempos, reportes, wait=False):
+    # Los resultados de cada tema se guardan en cuanto existe su reporte; con
+    # ``wait`` se espera a todos los reportes en curso.
+    if wait:
+        terminados = as_completed(list(reportes))
+    else:
+        terminados = [futuro for futuro in list(reportes) if futuro.done()]
+    for futuro in terminados:
+        tema, resultados = reportes.pop(futuro)
+        try:
+            futuro.result()
+        except Exception as error:
+            # Sin reporte no se guardan los resultados: la siguiente ejecución
+            # vuelve a analizar los mismos tweets.
+            deploy_tools.make_log_control(
+                f"error de reporte ({error})", topic=tema, stage="reportes", level=logging.ERROR
+            )
+            checkpoint.mark_failed(tema)
+            continue
+        save_topic_results(tema, resultados)
+        checkpoint.mark_done(tema)
+        deploy_tools.make_log_control("tema terminado", topic=tema, stage="reportes", tiempos=tiempos[tema])
+
+
+def run_pipeline(
+    lista_final,
+    cache=None,
+    scrape_concurrency=SCRAPE_CONCURRENCY,
+    analysis_workers=ANALYSIS_WORKERS,
+    report_engine=plot_tools.REPORT_ENGINE,
+):
+    """
+    Descarga y analiza una lista de temas.
+
+    Las descargas se ejecutan en paralelo en un grupo de hilos, con un
+    máximo de ``scrape_concurrency`` al mismo tiempo; cada tema se
+    analiza en cuanto termina su descarga, mientras las demás siguen en
+    curso. Con ``analysis_workers`` mayor a uno los temas se analizan en
+    un grupo de procesos, cada uno con los modelos ya cargados.
+
+    El reporte PDF de cada tema se genera en un grupo de hilos en cuanto
+    termina su análisis. Sólo cuando el reporte existe se guardan los
+    resultados y el estado del tema y se marca como terminado en el
+    ``state_tools.Checkpoint``; si la ejecución se interrumpe, la
+    siguiente sólo procesa los temas que no terminaron ni fallaron. Los temas que fallan se registran en el log y en el
+    avance, y al terminar normalmente el avance se elimina para que la
+    siguiente ejecución intente de nuevo todo el lote. Al final se
+    guardan el resumen de tiempos y memoria por tema y etapa
+    (``profile_tools.write_summary``) y su traza.
+
+    Parámetros
+    ----------
+    lista_final : list
+        Temas a procesar.
+    cache : cache_tools.ResultCache, optional
+        Caché de resultados por frase (sólo en el proceso principal).
+    scrape_concurrency : int, optional
+        Número máximo de descargas simultáneas.
+    analysis_workers : int, optional
+        Número de procesos de análisis.
+    report_engine : str, optional
+        Motor de los reportes PDF (``"wkhtmltopdf"`` o ``"reportlab"``).
+
+    Retorna
+    -------
+    dict
+        Segundos empleados en cada etapa, por tema.
+    """
+    tiempos = {}
+    analisis = {}
+    # Reporte en curso de cada tema, con los resultados por guardar.
+    reportes = {}
+    # ReportLab genera los reportes dentro del proceso, de uno en uno.
+    reportes_pool = ThreadPoolExecutor(
+        max_workers=1 if report_engine == "reportlab" else plot_tools.REPORT_WORKERS
+    )
+    pool = None
+    checkpoint = state_tools.Checkpoint(lista_final)
+    pendientes = checkpoint.pending(lista_final)
+    if analysis_workers > 1:
+        torch_threads = max(1, (os.cpu_count() or 1) // analysis_workers)
+        # Los procesos se inician con "spawn" y no con fork: al crearse ya
+        # corren los hilos de descarga y el de los logs, y un proceso
+        # copiado con fork podría heredar sus candados tomados y la
+        # conexión SQLite del proceso principal.
+        pool = ProcessPoolExecutor(
+            max_workers=analysis_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_worker,
+            initargs=(torch_threads, sentiment_tools.SENTIMENT_BACKEND),
+        )
+    else:
+        model_tools.preload_models([model_tools.SPACY_MODEL, sentiment_tools.model_name()])
+    with ThreadPoolExecutor(max_workers=scrape_concurrency) as executor:
+        descargas = {
+            executor.submit(scrape_topic, tema, state_tools.load_topic_state(tema)["last_tweet_id"]): tema
+            for tema in pendientes
+        }
+        for descarga in as_completed(descargas):
+            tema = descargas[descarga]
+            try:
+                output_filename, tiempo_descarga = descarga.result()
+            except Exception as error:
+                deploy_tools.make_log_control(
+                    f"error de descarga ({error})", topic=tema, stage="descarga", level=logging.ERROR
+                )
+                checkpoint.mark_failed(tema)
+                continue
+            tiempos[tema] = {"descarga": tiempo_descarga}
+            if pool is None:
+                try:
+                    with profile_tools.topic(tema):
+                        tiempos_tema, reporte, resultados = analyze_topic(tema, output_filename, cache)
+                except Exception as error:
+                    deploy_tools.make_log_control(
+                        f"error de análisis ({error})", topic=tema, stage="analisis", level=logging.ERROR
+                    )
+                    checkpoint.mark_failed(tema)
+                    continue
+                _record_analysis(
+                    checkpoint, tiempos, reportes, reportes_pool, report_engine, tema, tiempos_tema, reporte, resultados
+                )
+            else:
+                analisis[pool.submit(_analyze_in_worker, tema, output_filename)] = tema
+    if pool is not None:
+        for resultado in as_completed(analisis):
+            tema = analisis[resultado]
+            try:
+                tiempos_tema, reporte, resultados, registros = resultado.result()
+                profile_tools.add_records(registros)
+            except Exception as error:
+                deploy_tools.make_log_control(
+                    f"error de análisis ({error})", topic=tema, stage="analisis", level=logging.ERROR
+                )
+                checkpoint.mark_failed(tema)
+                continue
+            _record_analysis(
+                checkpoint, tiempos, reportes, reportes_pool, report_engine, tema, tiempos_tema, reporte, resultados
+            )
+        pool.shutdown()
+    with profile_tools.stage("reportes", items=len(reportes)) as etapa:
+        pendientes = len(reportes)
+        _finish_reports(checkpoint, tiempos, reportes, wait=True)
+    reportes_pool.shutdown()
+    deploy_tools.make_log_control(
+        f"{pendientes} reportes en curso terminados en {etapa['wall_seconds']:.2f} s", stage="reportes"
+    )
+    checkpoint.clear()
+    profile_tools.write_summary()
+    profile_tools.write_trace()
+    return tiempos
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Análisis de hashtags de Twitter")
+    parser.add_argument("--workers", type=int, default=ANALYSIS_WORKERS, help="procesos de análisis")
+    parser.add_argument("--descargas", type=int, default=SCRAPE_CONCURRENCY, help="descargas simultáneas")
+    parser.add_argument("--perfil", action="store_true", help="guardar un perfil de cProfile")
+    parser.add_argument(
+        "--sentimiento", choices=sentiment_tools.BACKENDS, default=sentiment_tools.SENTIMENT_BACKEND,
+        help="motor del modelo de sentimientos",
+    )
+    parser.add_argument(
+        "--motor", choices=plot_tools.REPORT_ENGINES, default=plot_tools.REPORT_ENGINE,
+        help="motor de los reportes PDF",
+    )
+    args = parser.parse_args()
+    sentiment_tools.SENTIMENT_BACKEND = args.sentimiento
+    import pandas as pd
+
+    df = pd.read_csv('resultados_hashtags.csv', encoding="latin1")
+    mas_tuiteado = df["mas_tuiteado"].values.tolist()
+    mas_duradero = df["mas_duradero"].values.tolist()
+    lista_final = mas_tuiteado + mas_duradero
+    lista_final = ["#Reforma", "#reforma#PlanB"]
+    cache = cache_tools.ResultCache()
+    with profile_tools.cprofile(enabled=args.perfil):
+        run_pipeline(lista_final, cache, args.descargas, args.workers, args.motor)
\ No newline at end of file
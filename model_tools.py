@@ -0,0 +1,231 @@
+import os
+import threading
+import time
+
+SPACY_MODEL = "spacy_es"
+SENTIMENT_MODEL = "sentiment_es"
+# Modelos que se cargan por adelantado si no se indica otra cosa.
+DEFAULT_MODELS = (SPACY_MODEL, SENTIMENT_MODEL)
+
+_models = {}
+_stats = {}
+_lock = threading.RLock()
+
+
+def _make_keyword_phrases(nlp, name, max_phrases):
+    from spacy.tokens import Doc
+
+    def keyword_phrases(doc):
+        # Se guardan sólo los textos de las frases para que el documento
+        # pueda serializarse entre procesos (``nlp.pipe(n_process=...)``).
+        doc._.keyword_phrases = [
+            phrase.text for phrase in doc._.phrases[:max_phrases]
+        ]
+        doc._.phrases = []
+        if Doc.has_extension("textrank"):
+            doc._.textrank = None
+        return doc
+
+    return keyword_phrases
+
+
+def _register_keyword_phrases():
+    from spacy.language import Language
+    from spacy.tokens import Doc
+
+    if not Doc.has_extension("keyword_phrases"):
+        Doc.set_extension("keyword_phrases", default=[])
+    if not Language.has_factory("keyword_phrases"):
+        Language.factory(
+            "keyword_phrases",
+            default_config={"max_phrases": 1},
+            func=_make_keyword_phrases,
+        )
+
+
+def _load_spacy_es():
+    import pytextrank  # noqa: F401  Registra el componente "textrank".
+    import spacy
+
+    _register_keyword_phrases()
+    nlp = spacy.load("es_core_news_md")
+    nlp.add_pipe("textrank")
+    nlp.add_pipe("keyword_phrases", after="textrank")
+    return nlp
+
+
+def _load_sentiment_es():
+    from pysentimiento import create_analyzer
+
+    return create_analyzer(task="sentiment", lang="es")
+
+
+_loaders = {
+    SPACY_MODEL: _load_spacy_es,
+    SENTIMENT_MODEL: _load_sentiment_es,
+}
+
+
+def _get_rss_mb():
+    """
+    Obtiene la memoria residente actual del proceso.
+
+    Retorna
+    -------
+    float
+        Memoria residente en MB. Si ``/proc`` no está disponible se
+        usa el pico de memoria reportado por ``resource`` y, donde no
+        existe ese módulo (Windows), ``psutil``; sin ninguno de los dos
+        se retorna ``None``.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        pass
+    else:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().rss / (1024 * 1024)
+
+
+def register_model(name, loader):
+    """
+    Registra una función de carga para un modelo.
+
+    Parámetros
+    ----------
+    name : str
+        Nombre con el que se solicitará el modelo.
+    loader : callable
+        Función sin argumentos que construye y retorna el modelo.
+    """
+    with _lock:
+        _loaders[name] = loader
+
+
+def get_model(name):
+    """
+    Obtiene un modelo cargándolo sólo la primera vez.
+
+    Los modelos se guardan en memoria por proceso, de modo que todas las
+    funciones de ``text_tools`` comparten la misma instancia en lugar de
+    cargarla en cada llamada.
+
+    Parámetros
+    ----------
+    name : str
+        Nombre del modelo (``SPACY_MODEL`` o ``SENTIMENT_MODEL``).
+
+    Retorna
+    -------
+    object
+        La instancia del modelo.
+
+    Véase También
+    -------------
+    preload_models : Carga los modelos por adelantado.
+    evict_model : Libera un modelo de la memoria.
+    """
+    model = _models.get(name)
+    if model is not None:
+        return model
+    with _lock:
+        model = _models.get(name)
+        if model is None:
+            if name not in _loaders:
+                raise KeyError(f"Modelo desconocido: {name}")
+            rss_before = _get_rss_mb()
+            start = time.perf_counter()
+            model = _loaders[name]()
+            rss_after = _get_rss_mb()
+            _stats[name] = {
+                "load_seconds": time.perf_counter() - start,
+                "rss_mb": (
+                    max(rss_after - rss_before, 0.0)
+                    if rss_before is not None and rss_after is not None
+                    else None
+                ),
+                "loaded_at": time.time(),
+            }
+            _models[name] = model
+    return model
+
+
+def preload_models(names=None):
+    """
+    Carga por adelantado los modelos indicados.
+
+    Útil al iniciar el bot o un proceso de trabajo para no pagar el
+    tiempo de carga durante el análisis del primer tema.
+
+    Parámetros
+    ----------
+    names : list, optional
+        Modelos a cargar. Por defecto ``DEFAULT_MODELS``.
+
+    Retorna
+    -------
+    dict
+        Estadísticas de carga de cada modelo.
+    """
+    if names is None:
+        names = DEFAULT_MODELS
+    for name in names:
+        get_model(name)
+    return get_model_stats()
+
+
+def evict_model(name=None):
+    """
+    Libera uno o todos los modelos cargados.
+
+    Parámetros
+    ----------
+    name : str, optional
+        Modelo a liberar. Si no se indica se liberan todos.
+    """
+    with _lock:
+        names = list(_models) if name is None else [name]
+        for item in names:
+            _models.pop(item, None)
+            _stats.pop(item, None)
+
+
+def is_loaded(name):
+    """
+    Indica si un modelo ya está en memoria.
+
+    Parámetros
+    ----------
+    name : str
+        Nombre del modelo.
+
+    Retorna
+    -------
+    bool
+        ``True`` si el modelo está cargado.
+    """
+    return name in _models
+
+
+def get_model_stats():
+    """
+    Reporta el tiempo de carga y la memoria de cada modelo.
+
+    Retorna
+    -------
+    dict
+        Por cada modelo cargado: ``load_seconds`` (segundos de carga),
+        ``rss_mb`` (incremento de memoria residente en MB) y ``loaded_at``.
+    """
+    with _lock:
+        return {name: dict(stats) for name, stats in _stats.items()}
@@ -1,15 +1,25 @@
+import base64
+import contextlib
+import contextvars
 import csv
+import heapq
+import io
+import logging
+import os
+import pathlib
+import string
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
-import pandas as pd
-import pdfkit
-from matplotlib import pyplot as plt
-from reportlab.lib import colors
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.pdfgen import canvas
-
+import deploy_tools
+import profile_tools
 import text_tools
 
+# Matplotlib, ReportLab, pdfkit y pandas se importan la primera vez que
+# se usan, para que importar este módulo no retrase el arranque.
+
 
 def dict_to_csv(fecha, dict, name):
     """
@@ -60,189 +70,59 @@ def list_to_csv(fecha, data_list, name):
         write.writerows(rows)
     return f"{fecha}: Archivo {name} generado"
 
-def get_pie_chart(fecha, name, dict):
-    """
-    Traza una gráfica de pastel.
+# Estilo de cada tipo de gráfica. Las figuras ya creadas de cada tipo se
+# guardan en un grupo del proceso y se limpian para reutilizarlas en
+# lugar de crear una nueva cada vez.
+CHART_TEMPLATES = {
+    "pie": {"figsize": (6.4, 4.8)},
+    "barh": {"figsize": (6.4, 4.8)},
+    "point": {"figsize": (6.4, 4.8)},
+}
+CHART_FORMAT = "png"
+CHART_DPI = 100
+CHART_WORKERS = 4
 
-    La gráfica de pastel emplea los datos que recopiló el bot para
-    poder representar dicha información de forma visual, y así, sea
-    fácil de interpretar.
+_figures = {}
+_figures_lock = threading.Lock()
 
-    Parámetros
-    ----------
-    fecha : str
-        Fecha en la que se realizo el análisis.
-    name : str
-        El nombre del archivo.
-    dict : str
-        El diccionario de datos que genero el bot.
-    
-    Retorna
-    -------
-    str
-        Aviso de que el archivo ha sido generado.
-    
-    Véase También
-    -------------
-    plt.pie : Traza una gráfica de pastel.
-    plt.axis : Configura los ejes de la gráfica.
-    plt.savefig : Guarda la gráfica como una imagen.
-    plt.close : Cierra la ventana que muestra la gráfica.
-    """
-    colors = ["#969899", "#767473", "#DCC8A6"]
-    plt.pie(dict.values(), labels=dict.keys(), autopct="%0.1f %%", colors=colors)
-    plt.axis("equal")
-    # plt.title('Percentage by value')
-    plt.savefig(f"{name}_{fecha}.png", bbox_inches="tight")
-    plt.close()
-    return f"Archivo {name} generado"
+# Tamaños de la nube de palabras. El tiempo de acomodo crece con el área
+# del lienzo (``width`` x ``height``); ``scale`` sólo amplía la imagen
+# final, así que "normal" se acomoda en 400x200 y se dibuja en 800x400.
+WORD_CLOUD_TEMPLATES = {
+    "normal": {"width": 400, "height": 200, "scale": 2},
+    "pequena": {"width": 300, "height": 150, "scale": 1},
+}
+WORD_CLOUD_MAX_WORDS = 1000
+WORD_CLOUD_MASK_PATH = None
+# Acomodos de palabras que conserva el proceso, para no recalcular la
+# nube cuando las frecuencias no cambiaron.
+WORD_CLOUD_LAYOUT_CACHE = 32
 
+_word_clouds = {}
+_word_cloud_layouts = OrderedDict()
+_word_clouds_lock = threading.Lock()
 
-def get_barh_chart(fecha, name, dict):
-    """
-    Traza una gráfica de barras horizontales.
 
-    La gráfica de barras emplea los datos que recopiló el bot para
-    poder representar dicha información de forma visual, y así, sea
-    fácil de interpretar.
-
-    Parámetros
-    ----------
-    fecha : str
-        Fecha en la que se realizo el análisis.
-    name : str
-        El nombre del archivo.
-    dict : str
-        El diccionario de datos que genero el bot.
-    
-    Retorna
-    -------
-    str
-        Aviso de que el archivo ha sido generado.
-    
-    Véase También
-    -------------
-    list : Lista de elementos.
-    plt.barh : Traza una gráfica de barras horizontales.
-    plt.ylabel : Establece la etiqueta del eje y.
-    plt.xlabel : Establece la etiqueta del eje x.
-    plt.savefig : Guarda la gráfica como una imagen.
-    plt.close : Cierra la ventana que muestra la gráfica.
+REPORT_ENGINES = ("wkhtmltopdf", "reportlab")
+REPORT_ENGINE = "wkhtmltopdf"
+REPORT_WORKERS = 4
+# Fuentes locales de los reportes (HTML y ReportLab); si no existen se
+# registra un aviso en el log y se usa una fuente del sistema en lugar
+# de descargarlas.
+REPORT_FONT_PATH = "./media/fonts/Montserrat-Regular.ttf"
+REPORT_TITLE_FONT_PATH = "./bin/SakBunderan.ttf"
+REPORT_TEMPLATE = string.Template(
     """
-    dict_values = list(dict.values())[:10]
-    dict_labels = list(dict.keys())[:10]
-    eje_x = dict_labels
-    eje_y = dict_values
-    plt.barh(eje_x, eje_y, color="#265B4E")
-    plt.ylabel("Values")
-    plt.xlabel("Frequency")
-    # plt.title('Frequency x Values')
-    plt.savefig(f"{name}_{fecha}.png", bbox_inches="tight")
-    plt.close()
-    return f"Archivo {name} generado"
-
-
-def get_point_plot(fecha, name, data_list):
-    """
-    Traza una gráfica de puntos.
-
-    La gráfica de puntos emplea los datos que recopiló el bot para
-    poder representar dicha información de forma visual, y así, sea
-    fácil de interpretar.
-
-    Parámetros
-    ----------
-    fecha : str
-        Fecha en la que se realizo el análisis.
-    name : str
-        El nombre del archivo.
-    data_list : str
-        Lista de datos Flesch Kincaid.
-    
-    Retorna
-    -------
-    str
-        Aviso de que el archivo ha sido generado.
-    
-    Véase También
-    -------------
-    list : Lista de elementos.
-    plt.plot : Trazar y versus x como líneas y/o marcadores.
-    plt.ylabel : Establece la etiqueta del eje y.
-    plt.xlabel : Establece la etiqueta del eje x.
-    plt.savefig : Guarda la gráfica como una imagen.
-    plt.close : Cierra la ventana que muestra la gráfica.
-    """
-    data_order = list(range(1, (len(data_list) + 1)))
-    plt.plot(data_order, data_list, ":", color="b")
-    plt.ylabel("Flesch Kincaid")
-    plt.xlabel("History")
-    # plt.title('Flesch Kincaid Historical')
-    plt.savefig(f"{name}_{fecha}.png", bbox_inches="tight")
-    plt.close()
-    return f"Archivo {name} generado"
-
-
-def read_csv(name):
-    """
-    Lee un archivo .csv y crea un marco de datos.
-
-    El usuario da el nombre del archivo .csv que desea que esta función
-    lea. A partir de dicho archivo, crea un marco de datos.
-
-    Parámetros
-    ----------
-    name : str
-        Nombre del archivo.
-    
-    Retorna
-    -------
-    DataFrame
-        Marco de datos del archivo que se leyo.
-    
-    Véase También
-    -------------
-    pandas.read_csv : Leer un archivo .csv en DataFrame.
-    """
-    df = pd.read_csv(name, encoding="utf8")
-    return df
-
-
-def get_report_pdf(dict):
-    """
-    Crea el reporte del analisis en un archivo PDF.
-
-    Utiliza lenguaje HTML para diseñar el archivo PDF. Los datos que se muestran
-    en el archivo PDF son los que se obtuvieron del análisis de los post de
-    Facebook.
-
-    Parámetros
-    ----------
-    dict : str
-        Diccionario de datos.
-    
-    Véase También
-    -------------
-    pdfkit.from_string : Crea un archivo PDF a partir de un ``string``.
-    """
-    kitoptions = {
-        "enable-local-file-access": None,
-        "margin-left": "0mm",
-        "margin-right": "0mm",
-        "margin-bottom": "0mm",
-        "margin-top": "0mm",
-    }
-
-    pdfkit.from_string(
-        f"""
 <!doctype html>
 <html lang="es">
     <title></title>
     <meta charset="utf-8">
     <meta name="viewport" content="width=device-width, initial-scale=1">
-    """
-        + """<style>
-        @import url('http://fonts.cdnfonts.com/css/montserrat');
+    <style>
+        @font-face {
+            font-family: 'Montserrat';
+            src: url('$font_url') format('truetype');
+        }
         *{
             font-family: 'Montserrat', sans-serif;
             margin-left: 10px;
@@ -313,8 +193,7 @@ def get_report_pdf(dict):
             width: 100%;
             height: 100px;
         }
-    </style>"""
-        + f"""</head>
+    </style></head>
     <body>
         <h2>Unidad de Planeación y Prospectiva</h2>
         <h1 class="title">Análisis de percepción ciudadana en redes</h1>
@@ -325,19 +204,19 @@ def get_report_pdf(dict):
             </tr>
             <tr class="table-info-general">
                 <td class="table-info-general table-fist-column">Nombre publicación:</td>
-                <td class="table-info-general table-info-general-color">{dict['titulo']}</td>
+                <td class="table-info-general table-info-general-color">$titulo</td>
             </tr>
             <tr class="table-info-general">
                 <td class="table-info-general table-fist-column">URL:</td>
                 <td class="table-info-general table-info-general-color">
                     <span class="table-url">
-                        {dict['textos'][0]}
+                        $texto_0
                     </span>
                 </td>
             </tr>
             <tr class="table-info-general">
                 <td class="table-info-general table-fist-column">Comentarios:</td>
-                <td class="table-info-general table-info-general-color">{dict['textos'][1]}</td>
+                <td class="table-info-general table-info-general-color">$texto_1</td>
             </tr>
         </table>
         <h3>Interpretación</h3>
@@ -346,18 +225,18 @@ def get_report_pdf(dict):
             <tr>
                 <td width="50%">
                     <p>
-                        {dict['textos_imagenes'][0]}
+                        $texto_imagen_0
                     </p>
                     <div align="center" class="imgplot">
-                        <img class="rounded" src="{dict['imagenes'][0]}">
+                        <img class="rounded" src="$imagen_0">
                     </div>
                 </td>
                 <td width="50%">
                     <p>
-                        {dict['textos_imagenes'][1]}
+                        $texto_imagen_1
                     </p>
                     <div align="center" class="imgplot">
-                        <img class="rounded" src="{dict['imagenes'][1]}">
+                        <img class="rounded" src="$imagen_1">
                     </div>
                 </td>
             </tr>
@@ -366,20 +245,20 @@ def get_report_pdf(dict):
                     <h3>Frecuencia de palabras clave</h3>
                     <hr/>
                     <p>
-                        {dict['textos_imagenes'][2]}
+                        $texto_imagen_2
                     </p>
                     <div align="center" class="imgplot">
-                        <img class="rounded" src="{dict['imagenes'][2]}">
+                        <img class="rounded" src="$imagen_2">
                     </div>
                 </td>
                 <td width="50%">
                     <h3>Análisis de sentimientos</h3>
                     <hr/>
                     <p>
-                        {dict['textos_imagenes'][3]}
+                        $texto_imagen_3
                     </p>
                     <div align="center" class="imgplot">
-                        <img class="rounded" src="{dict['imagenes'][3]}">
+                        <img class="rounded" src="$imagen_3">
                     </div>
                 </td>
             </tr>
@@ -389,19 +268,669 @@ def get_report_pdf(dict):
         </div>
     </body>
 </html>
-""",
+"""
+)
+
+_pdfkit_configuration = None
+_report_title_font = None
+_missing_fonts = set()
+
+
+@contextlib.contextmanager
+def _figure(template):
+    """
+    Presta una figura reutilizable de un tipo de gráfica.
+
+    Las figuras se crean con la API orientada a objetos de Matplotlib
+    (``Figure`` y ``FigureCanvasAgg``) sin pasar por el estado global de
+    ``pyplot``. Las libres se guardan en un grupo del proceso protegido
+    por un candado, así que sobreviven a los hilos que las usaron y dos
+    hilos nunca dibujan en la misma figura; al salir del bloque la
+    figura vuelve al grupo.
+
+    Parámetros
+    ----------
+    template : str
+        Tipo de gráfica (una llave de ``CHART_TEMPLATES``).
+
+    Retorna
+    -------
+    Figure
+        La figura limpia, lista para dibujar.
+    """
+    with _figures_lock:
+        free = _figures.setdefault(template, [])
+        fig = free.pop() if free else None
+    if fig is None:
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        fig = Figure(**CHART_TEMPLATES[template])
+        FigureCanvasAgg(fig)
+    fig.clear()
+    try:
+        yield fig
+    finally:
+        with _figures_lock:
+            _figures[template].append(fig)
+
+
+def _save_figure(fig, fecha, name, fmt, dpi, in_memory=False):
+    """
+    Guarda una figura como imagen.
+
+    Parámetros
+    ----------
+    fig : Figure
+        La figura a guardar.
+    fecha : str
+        Fecha en la que se realizo el análisis.
+    name : str or None
+        El nombre del archivo; con ``None`` no se escribe en disco.
+    fmt : str
+        Formato de la imagen (``"png"`` o ``"svg"``).
+    dpi : int
+        Resolución de la imagen PNG.
+    in_memory : bool, optional
+        Si es ``True`` se regresan los bytes de la imagen.
+
+    Retorna
+    -------
+    bytes or None
+        Los bytes de la imagen si ``in_memory`` es ``True``.
+    """
+    if not in_memory:
+        path = f"{name}_{fecha}.{fmt}"
+        fig.savefig(path, format=fmt, dpi=dpi, bbox_inches="tight")
+        return None
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format=fmt, dpi=dpi, bbox_inches="tight")
+    image = buffer.getvalue()
+    if name is not None:
+        with open(f"{name}_{fecha}.{fmt}", "wb") as f:
+            f.write(image)
+    return image
+
+
+def _image_mime(image):
+    if image.lstrip()[:1] == b"<":
+        return "image/svg+xml"
+    return "image/png"
+
+
+def image_data_uri(image):
+    """
+    Convierte una imagen en memoria en un URI ``data:``.
+
+    Parámetros
+    ----------
+    image : bytes or str
+        Bytes de la imagen, o una ruta/URL que se regresa sin cambios.
+
+    Retorna
+    -------
+    str
+        URI que puede usarse directamente en el ``src`` de una imagen HTML.
+    """
+    if isinstance(image, (bytes, bytearray)):
+        encoded = base64.b64encode(image).decode("ascii")
+        return f"data:{_image_mime(image)};base64,{encoded}"
+    return image
+
+
+@profile_tools.profiled("grafica_sentimientos")
+def get_pie_chart(fecha, name, dict, fmt=CHART_FORMAT, dpi=CHART_DPI, in_memory=False):
+    """
+    Traza una gráfica de pastel.
+
+    La gráfica de pastel emplea los datos que recopiló el bot para
+    poder representar dicha información de forma visual, y así, sea
+    fácil de interpretar.
+
+    Parámetros
+    ----------
+    fecha : str
+        Fecha en la que se realizo el análisis.
+    name : str
+        El nombre del archivo.
+    dict : str
+        El diccionario de datos que genero el bot.
+    fmt : str, optional
+        Formato de la imagen: ``"png"`` o ``"svg"``.
+    dpi : int, optional
+        Resolución de la imagen PNG; una menor se genera más rápido.
+    in_memory : bool, optional
+        Si es ``True`` la imagen se genera en memoria y se regresan sus
+        bytes; sólo se guarda en disco si ``name`` no es ``None``.
+    
+    Retorna
+    -------
+    str or bytes
+        Aviso de que el archivo ha sido generado, o los bytes de la
+        imagen si ``in_memory`` es ``True``.
+    
+    Véase También
+    -------------
+    Axes.pie : Traza una gráfica de pastel.
+    Axes.axis : Configura los ejes de la gráfica.
+    Figure.savefig : Guarda la gráfica como una imagen.
+    """
+    colors = ["#969899", "#767473", "#DCC8A6"]
+    with _figure("pie") as fig:
+        ax = fig.add_subplot()
+        ax.pie(dict.values(), labels=dict.keys(), autopct="%0.1f %%", colors=colors)
+        ax.axis("equal")
+        # ax.set_title('Percentage by value')
+        image = _save_figure(fig, fecha, name, fmt, dpi, in_memory)
+    if in_memory:
+        return image
+    return f"Archivo {name} generado"
+
+
+@profile_tools.profiled("grafica_palabras", items_arg="dict")
+def get_barh_chart(fecha, name, dict, fmt=CHART_FORMAT, dpi=CHART_DPI, in_memory=False):
+    """
+    Traza una gráfica de barras horizontales.
+
+    La gráfica de barras emplea los datos que recopiló el bot para
+    poder representar dicha información de forma visual, y así, sea
+    fácil de interpretar.
+
+    Parámetros
+    ----------
+    fecha : str
+        Fecha en la que se realizo el análisis.
+    name : str
+        El nombre del archivo.
+    dict : str
+        El diccionario de datos que genero el bot.
+    fmt : str, optional
+        Formato de la imagen: ``"png"`` o ``"svg"``.
+    dpi : int, optional
+        Resolución de la imagen PNG; una menor se genera más rápido.
+    in_memory : bool, optional
+        Si es ``True`` la imagen se genera en memoria y se regresan sus
+        bytes; sólo se guarda en disco si ``name`` no es ``None``.
+    
+    Retorna
+    -------
+    str or bytes
+        Aviso de que el archivo ha sido generado, o los bytes de la
+        imagen si ``in_memory`` es ``True``.
+    
+    Véase También
+    -------------
+    list : Lista de elementos.
+    Axes.barh : Traza una gráfica de barras horizontales.
+    Axes.set_ylabel : Establece la etiqueta del eje y.
+    Axes.set_xlabel : Establece la etiqueta del eje x.
+    Figure.savefig : Guarda la gráfica como una imagen.
+    """
+    dict_values = list(dict.values())[:10]
+    dict_labels = list(dict.keys())[:10]
+    eje_x = dict_labels
+    eje_y = dict_values
+    with _figure("barh") as fig:
+        ax = fig.add_subplot()
+        ax.barh(eje_x, eje_y, color="#265B4E")
+        ax.set_ylabel("Values")
+        ax.set_xlabel("Frequency")
+        # ax.set_title('Frequency x Values')
+        image = _save_figure(fig, fecha, name, fmt, dpi, in_memory)
+    if in_memory:
+        return image
+    return f"Archivo {name} generado"
+
+
+@profile_tools.profiled("grafica_legibilidad", items_arg="data_list")
+def get_point_plot(
+    fecha,
+    name,
+    data_list,
+    rolling=None,
+    fmt=CHART_FORMAT,
+    dpi=CHART_DPI,
+    in_memory=False,
+):
+    """
+    Traza una gráfica de puntos.
+
+    La gráfica de puntos emplea los datos que recopiló el bot para
+    poder representar dicha información de forma visual, y así, sea
+    fácil de interpretar.
+
+    Parámetros
+    ----------
+    fecha : str
+        Fecha en la que se realizo el análisis.
+    name : str
+        El nombre del archivo.
+    data_list : str
+        Lista de datos Flesch Kincaid.
+    rolling : list, optional
+        Promedio móvil de los datos; si se proporciona se traza encima
+        de los puntos.
+    fmt : str, optional
+        Formato de la imagen: ``"png"`` o ``"svg"``.
+    dpi : int, optional
+        Resolución de la imagen PNG; una menor se genera más rápido.
+    in_memory : bool, optional
+        Si es ``True`` la imagen se genera en memoria y se regresan sus
+        bytes; sólo se guarda en disco si ``name`` no es ``None``.
+    
+    Retorna
+    -------
+    str or bytes
+        Aviso de que el archivo ha sido generado, o los bytes de la
+        imagen si ``in_memory`` es ``True``.
+    
+    Véase También
+    -------------
+    list : Lista de elementos.
+    Axes.plot : Trazar y versus x como líneas y/o marcadores.
+    Axes.set_ylabel : Establece la etiqueta del eje y.
+    Axes.set_xlabel : Establece la etiqueta del eje x.
+    Figure.savefig : Guarda la gráfica como una imagen.
+    """
+    data_order = list(range(1, (len(data_list) + 1)))
+    with _figure("point") as fig:
+        ax = fig.add_subplot()
+        ax.plot(data_order, data_list, ":", color="b")
+        if rolling is not None:
+            ax.plot(data_order, rolling, "-", color="#9D2445")
+        ax.set_ylabel("Flesch Kincaid")
+        ax.set_xlabel("History")
+        # ax.set_title('Flesch Kincaid Historical')
+        image = _save_figure(fig, fecha, name, fmt, dpi, in_memory)
+    if in_memory:
+        return image
+    return f"Archivo {name} generado"
+
+
+@lru_cache(maxsize=8)
+def _load_mask(path):
+    import numpy as np
+    from PIL import Image
+
+    with Image.open(path) as image:
+        return np.array(image.convert("L"))
+
+
+@contextlib.contextmanager
+def _word_cloud(template, mask_path, max_words):
+    """
+    Presta un objeto ``WordCloud`` reutilizable.
+
+    Como las figuras de ``_figure``, los objetos libres de cada
+    configuración se guardan en un grupo del proceso protegido por un
+    candado y la máscara se lee una sola vez por proceso.
+    """
+    key = (template, mask_path, max_words)
+    with _word_clouds_lock:
+        free = _word_clouds.setdefault(key, [])
+        cloud = free.pop() if free else None
+    if cloud is None:
+        from wordcloud import WordCloud
+
+        mask = _load_mask(mask_path) if mask_path else None
+        cloud = WordCloud(
+            background_color="white",
+            max_words=max_words,
+            mask=mask,
+            random_state=0,
+            **WORD_CLOUD_TEMPLATES[template],
+        )
+    try:
+        yield cloud
+    finally:
+        with _word_clouds_lock:
+            _word_clouds[key].append(cloud)
+
+
+@profile_tools.profiled("nube_palabras", items_arg="frequencies")
+def get_word_cloud(
+    fecha,
+    name,
+    frequencies,
+    template="normal",
+    mask_path=WORD_CLOUD_MASK_PATH,
+    max_words=WORD_CLOUD_MAX_WORDS,
+    fmt=CHART_FORMAT,
+    in_memory=False,
+):
+    """
+    Genera la nube de palabras de un tema.
+
+    Se construye a partir de una tabla de frecuencias ya calculada (por
+    ejemplo ``corpus_tools.Corpus.token_frequencies``) con
+    ``generate_from_frequencies``, sin volver a separar el texto. Si las
+    frecuencias son las mismas que en una llamada anterior del proceso
+    (desde cualquier hilo) se reutiliza el acomodo de las palabras.
+
+    Parámetros
+    ----------
+    fecha : str
+        Fecha en la que se realizo el análisis.
+    name : str or None
+        El nombre del archivo; con ``None`` no se escribe en disco.
+    frequencies : dict
+        Frecuencia de cada palabra.
+    template : str, optional
+        Tamaño del lienzo (una llave de ``WORD_CLOUD_TEMPLATES``).
+    mask_path : str, optional
+        Imagen cuya silueta (en blanco el fondo) limita la nube.
+    max_words : int, optional
+        Número máximo de palabras.
+    fmt : str, optional
+        Formato de la imagen (``"png"`` o ``"svg"``).
+    in_memory : bool, optional
+        Si es ``True`` se regresan los bytes de la imagen.
+
+    Retorna
+    -------
+    bytes or str or None
+        Los bytes de la imagen si ``in_memory`` es ``True``; si no, un
+        aviso de que el archivo se generó. ``None`` si no hay palabras.
+
+    Véase También
+    -------------
+    wordcloud.WordCloud.generate_from_frequencies : Acomoda las palabras de una nube.
+    """
+    if not frequencies:
+        return None
+    top = heapq.nsmallest(
+        max_words, frequencies.items(), key=lambda item: (-item[1], item[0])
+    )
+    key = (template, mask_path, max_words, tuple(top))
+    with _word_clouds_lock:
+        layout = _word_cloud_layouts.get(key)
+        if layout is not None:
+            _word_cloud_layouts.move_to_end(key)
+    with _word_cloud(template, mask_path, max_words) as cloud:
+        if layout is None:
+            cloud.generate_from_frequencies(dict(top))
+            with _word_clouds_lock:
+                _word_cloud_layouts[key] = cloud.layout_
+                if len(_word_cloud_layouts) > WORD_CLOUD_LAYOUT_CACHE:
+                    _word_cloud_layouts.popitem(last=False)
+        else:
+            cloud.layout_ = layout
+        if fmt == "svg":
+            image = cloud.to_svg().encode("utf8")
+        else:
+            buffer = io.BytesIO()
+            cloud.to_image().save(buffer, format=fmt.upper())
+            image = buffer.getvalue()
+    if name is not None:
+        with open(f"{name}_{fecha}.{fmt}", "wb") as f:
+            f.write(image)
+    if in_memory:
+        return image
+    return f"Archivo {name} generado"
+
+
+@profile_tools.profiled("graficas_lote", items_arg="jobs")
+def render_charts(jobs, max_workers=CHART_WORKERS):
+    """
+    Genera varias gráficas en paralelo.
+
+    Como ninguna gráfica usa el estado global de ``pyplot`` y cada hilo
+    toma prestada su propia figura del grupo del proceso, las gráficas
+    de un tema pueden generarse al mismo tiempo; las figuras se
+    reutilizan en las llamadas siguientes.
+
+    Parámetros
+    ----------
+    jobs : list
+        Tuplas ``(función, argumentos, argumentos con nombre)``, por
+        ejemplo ``(get_pie_chart, (fecha, name, dict), {"fmt": "svg"})``.
+    max_workers : int, optional
+        Número de hilos.
+
+    Retorna
+    -------
+    list
+        El resultado de cada función, en el mismo orden que ``jobs``.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # Cada hilo conserva el tema del bloque ``profile_tools.topic``.
+        futures = [
+            executor.submit(contextvars.copy_context().run, function, *args, **kwargs)
+            for function, args, kwargs in jobs
+        ]
+        return [future.result() for future in futures]
+
+
+def read_csv(name):
+    """
+    Lee un archivo .csv y crea un marco de datos.
+
+    El usuario da el nombre del archivo .csv que desea que esta función
+    lea. A partir de dicho archivo, crea un marco de datos.
+
+    Parámetros
+    ----------
+    name : str
+        Nombre del archivo.
+    
+    Retorna
+    -------
+    DataFrame
+        Marco de datos del archivo que se leyo.
+    
+    Véase También
+    -------------
+    pandas.read_csv : Leer un archivo .csv en DataFrame.
+    """
+    import pandas as pd
+
+    df = pd.read_csv(name, encoding="utf8")
+    return df
+
+
+def _report_values(dict):
+    """
+    Prepara los valores de un reporte para la plantilla HTML.
+
+    Parámetros
+    ----------
+    dict : str
+        Diccionario de datos del reporte.
+
+    Retorna
+    -------
+    dict
+        Valores para ``REPORT_TEMPLATE``.
+    """
+    _font_available(REPORT_FONT_PATH)
+    values = {
+        "font_url": pathlib.Path(REPORT_FONT_PATH).absolute().as_uri(),
+        "titulo": dict["titulo"],
+        "texto_0": dict["textos"][0],
+        "texto_1": dict["textos"][1],
+    }
+    for index in range(4):
+        values[f"texto_imagen_{index}"] = dict["textos_imagenes"][index]
+        values[f"imagen_{index}"] = image_data_uri(dict["imagenes"][index])
+    return values
+
+
+def _get_pdfkit_configuration():
+    """
+    Obtiene la configuración de ``pdfkit`` una sola vez.
+
+    ``pdfkit.configuration`` busca el ejecutable de ``wkhtmltopdf`` con
+    un proceso externo; se guarda para no repetir la búsqueda en cada
+    reporte.
+    """
+    global _pdfkit_configuration
+    if _pdfkit_configuration is None:
+        import pdfkit
+
+        _pdfkit_configuration = pdfkit.configuration()
+    return _pdfkit_configuration
+
+
+@profile_tools.profiled("reporte_wkhtmltopdf")
+def get_report_pdf(dict):
+    """
+    Crea el reporte del analisis en un archivo PDF.
+
+    Utiliza lenguaje HTML para diseñar el archivo PDF. Los datos que se muestran
+    en el archivo PDF son los que se obtuvieron del análisis de los post de
+    Facebook. La plantilla se compila una sola vez y la fuente se toma de
+    ``REPORT_FONT_PATH``, sin descargar nada de internet. Las imágenes en
+    memoria (``bytes``) se incrustan como URI ``data:``, sin leerlas del
+    disco.
+
+    Parámetros
+    ----------
+    dict : str
+        Diccionario de datos.
+    
+    Véase También
+    -------------
+    pdfkit.from_string : Crea un archivo PDF a partir de un ``string``.
+    """
+    kitoptions = {
+        "enable-local-file-access": None,
+        "margin-left": "0mm",
+        "margin-right": "0mm",
+        "margin-bottom": "0mm",
+        "margin-top": "0mm",
+    }
+
+    import pdfkit
+
+    pdfkit.from_string(
+        REPORT_TEMPLATE.substitute(_report_values(dict)),
         f"{dict['ruta']}/{text_tools.clear_alphanumeric_text(dict['autor'])}_{dict['fecha']}.pdf",
         verbose=True,
         options=kitoptions,
+        configuration=_get_pdfkit_configuration(),
     )
 
 
+def get_reports_pdf(reports, engine=REPORT_ENGINE, max_workers=REPORT_WORKERS):
+    """
+    Crea los reportes PDF de un lote de temas.
+
+    Con ``engine="reportlab"`` los reportes se generan dentro del mismo
+    proceso con ``make_report``, sin lanzar ningún programa externo. Con
+    ``engine="wkhtmltopdf"`` se usa ``get_report_pdf`` y las conversiones
+    del lote corren en paralelo.
+
+    Parámetros
+    ----------
+    reports : list
+        Diccionarios de datos de cada reporte.
+    engine : str, optional
+        ``"reportlab"`` o ``"wkhtmltopdf"``.
+    max_workers : int, optional
+        Conversiones simultáneas de ``wkhtmltopdf``.
+
+    Retorna
+    -------
+    list
+        El resultado de cada reporte, en el mismo orden.
+    """
+    if engine == "reportlab":
+        return [get_topic_report_pdf(report, engine) for report in reports]
+    if engine != "wkhtmltopdf":
+        raise ValueError(f"Motor de reportes desconocido: {engine}")
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(
+            executor.map(lambda report: get_topic_report_pdf(report, engine), reports)
+        )
+
+
+def get_topic_report_pdf(report, engine=REPORT_ENGINE):
+    """
+    Crea el reporte PDF de un tema.
+
+    Permite generar cada reporte por separado (por ejemplo, en cuanto
+    termina el análisis de su tema) y atender sus errores uno por uno.
+
+    Parámetros
+    ----------
+    report : dict
+        Diccionario de datos del reporte.
+    engine : str, optional
+        ``"reportlab"`` o ``"wkhtmltopdf"``.
+
+    Retorna
+    -------
+    object
+        El resultado de ``make_report`` o ``get_report_pdf``.
+
+    Véase También
+    -------------
+    get_reports_pdf : Crea los reportes PDF de un lote de temas.
+    """
+    if engine == "reportlab":
+        function = make_report
+    elif engine == "wkhtmltopdf":
+        function = get_report_pdf
+    else:
+        raise ValueError(f"Motor de reportes desconocido: {engine}")
+    with profile_tools.topic(report.get("titulo")):
+        return function(report)
+
+
+def _font_available(path):
+    # Avisa una sola vez por proceso de cada fuente que falta.
+    if os.path.exists(path):
+        return True
+    if path not in _missing_fonts:
+        _missing_fonts.add(path)
+        deploy_tools.make_log_control(
+            f"no se encontró la fuente {path}; se usa una fuente del sistema",
+            stage="reportes",
+            level=logging.WARNING,
+        )
+    return False
+
+
+def _register_report_fonts():
+    global _report_title_font
+    if _report_title_font is None:
+        if _font_available(REPORT_TITLE_FONT_PATH):
+            from reportlab.pdfbase import pdfmetrics
+            from reportlab.pdfbase.ttfonts import TTFont
+
+            pdfmetrics.registerFont(TTFont("abc", REPORT_TITLE_FONT_PATH))
+            _report_title_font = "abc"
+        else:
+            _report_title_font = "Helvetica-Bold"
+    return _report_title_font
+
+
+def _image_source(image):
+    """
+    Prepara una imagen del reporte para ReportLab.
+
+    Las imágenes en memoria se leen con ``ImageReader`` sin pasar por el
+    disco y las URL ``file:///`` de ``get_report_pdf`` se convierten en
+    rutas.
+    """
+    if isinstance(image, (bytes, bytearray)):
+        from reportlab.lib.utils import ImageReader
+
+        return ImageReader(io.BytesIO(image))
+    if isinstance(image, str) and image.startswith("file:///"):
+        return image[len("file:///") :]
+    return image
+
+
+@profile_tools.profiled("reporte_reportlab")
 def make_report(dict):
     """
     Ingresa la información del análisis al archivo PDF.
 
     Agrega la información del análisis de los post de Facebook al archivo PDF
-    que se creo en la función ``def get_report_pdf``.
+    que se creo en la función ``def get_report_pdf``. Genera el reporte
+    dentro del mismo proceso con ReportLab; la fuente se registra una
+    sola vez por proceso.
 
     Parámetros
     ----------
@@ -419,10 +948,13 @@ def make_report(dict):
     images = dict["imagenes"]
     images_text = dict["textos_imagenes"]
     textLines = dict["textos"]
+    from reportlab.lib import colors
+    from reportlab.lib.utils import simpleSplit
+    from reportlab.pdfgen import canvas
+
     pdf = canvas.Canvas(fileName)
     pdf.setTitle(documentTitle)
-    pdfmetrics.registerFont(TTFont("abc", "./bin/SakBunderan.ttf"))
-    pdf.setFont("abc", 36)
+    pdf.setFont(_register_report_fonts(), 36)
     pdf.drawCentredString(300, 770, title)
     pdf.setFillColorRGB(0, 0, 255)
     pdf.setFont("Courier-Bold", 24)
@@ -438,18 +970,23 @@ def make_report(dict):
     text_images.setFillColor(colors.black)
     y_image = 600
     y_text = 750
-    pdf.drawInlineImage(images[0], 170, 350, width=250, height=200)
-    for line in images_text[0]:
+    pdf.drawImage(_image_source(images[0]), 170, 350, width=250, height=200)
+    for line in simpleSplit(images_text[0], "Courier", 10, 520):
         text.textLine(line)
     pdf.drawText(text)
     pdf.showPage()
     for count, image in enumerate(images):
         if count != 0:
-            pdf.drawInlineImage(image, 170, y_image, width=250, height=200)
-            text_images = pdf.beginText(40, y_image + 220)
-            for line in images_text[count]:
-                text_images.textLine(line)
-            pdf.drawText(text_images)
+            if y_image < 0:
+                pdf.showPage()
+                y_image = 600
+            pdf.drawImage(_image_source(image), 170, y_image, width=250, height=200)
+            if count < len(images_text):
+                text_images = pdf.beginText(40, y_image + 220)
+                text_images.setFont("Courier", 6)
+                for line in simpleSplit(images_text[count], "Courier", 6, 520):
+                    text_images.textLine(line)
+                pdf.drawText(text_images)
             y_text -= 250
             y_image -= 230
     pdf.save()
@@ -0,0 +1,412 @@
+import contextlib
+import contextvars
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+
+SUMMARY_PATH = "./perfiles/resumen.json"
+TRACE_PATH = "./perfiles/traza.json"
+CPROFILE_PATH = "./perfiles/ejecucion.prof"
+
+_records = []
+_lock = threading.Lock()
+_topic = contextvars.ContextVar("topic", default=None)
+
+
+def _read_status_mb(field):
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def _psutil_memory():
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info()
+
+
+def rss_mb():
+    """
+    Obtiene la memoria residente actual del proceso en MB.
+
+    Fuera de Linux se usa ``psutil`` si está instalado y, si no, el pico
+    de ``peak_rss_mb``.
+    """
+    value = _read_status_mb("VmRSS:")
+    if value is None:
+        memory = _psutil_memory()
+        if memory is not None:
+            return memory.rss / (1024 * 1024)
+        value = peak_rss_mb()
+    return value
+
+
+def peak_rss_mb():
+    """
+    Obtiene el pico de memoria residente del proceso en MB.
+
+    Usa ``/proc`` en Linux y ``resource`` en los demás Unix. En Windows
+    (sin ``resource``) usa el pico que reporta ``psutil``; si no está
+    instalado retorna ``None``.
+    """
+    value = _read_status_mb("VmHWM:")
+    if value is not None:
+        return value
+    try:
+        import resource
+    except ImportError:
+        memory = _psutil_memory()
+        peak = getattr(memory, "peak_wset", None)
+        return peak / (1024 * 1024) if peak is not None else None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+@contextlib.contextmanager
+def topic(tema):
+    """
+    Asocia las etapas medidas dentro del bloque con un tema.
+
+    Parámetros
+    ----------
+    tema : str
+        El tema (hashtag) que se procesa.
+    """
+    token = _topic.set(tema)
+    try:
+        yield
+    finally:
+        _topic.reset(token)
+
+
+def current_topic():
+    """
+    Obtiene el tema asociado con el bloque actual, o ``None``.
+    """
+    return _topic.get()
+
+
+@contextlib.contextmanager
+def stage(name, items=None, topic=None):
+    """
+    Mide una etapa del pipeline.
+
+    Registra el tiempo real, el tiempo de CPU del proceso, la memoria
+    residente al terminar y cuánto subió el pico de memoria durante la
+    etapa. El tiempo de CPU es de todo el proceso, así que incluye los
+    hilos de PyTorch o de las gráficas que trabajan para la etapa; si
+    dos etapas corren al mismo tiempo sus tiempos de CPU se traslapan.
+
+    Parámetros
+    ----------
+    name : str
+        Nombre de la etapa.
+    items : int, optional
+        Número de elementos que procesa la etapa; también puede
+        asignarse dentro del bloque con ``registro["items"] = n``.
+    topic : str, optional
+        Tema de la etapa; por defecto el del bloque ``topic`` actual.
+
+    Retorna
+    -------
+    dict
+        El registro de la etapa; se completa al salir del bloque.
+
+    Véase También
+    -------------
+    profiled : Mide cada llamada de una función.
+    """
+    record = {
+        "topic": topic if topic is not None else _topic.get(),
+        "stage": name,
+        "items": items,
+        "pid": os.getpid(),
+        "thread": threading.get_ident(),
+        "start": time.time(),
+    }
+    peak_before = peak_rss_mb()
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    try:
+        yield record
+    except BaseException as error:
+        record["error"] = repr(error)
+        raise
+    finally:
+        record["wall_seconds"] = time.perf_counter() - wall_start
+        record["cpu_seconds"] = time.process_time() - cpu_start
+        record["rss_mb"] = rss_mb()
+        record["peak_rss_mb"] = peak_rss_mb()
+        record["peak_rss_growth_mb"] = (
+            max(record["peak_rss_mb"] - peak_before, 0.0)
+            if record["peak_rss_mb"] is not None and peak_before is not None
+            else None
+        )
+        with _lock:
+            _records.append(record)
+
+
+def _count_items(value):
+    # El tamaño de un texto suelto son caracteres, no elementos.
+    if isinstance(value, str):
+        return None
+    try:
+        return len(value)
+    except TypeError:
+        return None
+
+
+def profiled(name=None, items_arg=None):
+    """
+    Decorador que mide cada llamada de una función como una etapa.
+
+    Parámetros
+    ----------
+    name : str, optional
+        Nombre de la etapa; por defecto ``modulo.funcion``.
+    items_arg : str, optional
+        Argumento cuyo tamaño (``len``) se registra como el número de
+        elementos procesados.
+
+    Retorna
+    -------
+    callable
+        El decorador.
+
+    Véase También
+    -------------
+    stage : Mide una etapa del pipeline.
+    """
+
+    def decorator(function):
+        stage_name = name or f"{function.__module__}.{function.__name__}"
+        signature = inspect.signature(function) if items_arg else None
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            items = None
+            if signature is not None:
+                bound = signature.bind_partial(*args, **kwargs)
+                if items_arg in bound.arguments:
+                    items = _count_items(bound.arguments[items_arg])
+            with stage(stage_name, items):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def get_records():
+    """
+    Obtiene una copia de los registros de este proceso.
+
+    Retorna
+    -------
+    list
+        Un diccionario por etapa medida.
+    """
+    with _lock:
+        return list(_records)
+
+
+def collect():
+    """
+    Obtiene y borra los registros de este proceso.
+
+    Sirve para que un proceso de análisis envíe sus registros al
+    proceso principal junto con el resultado de cada tema.
+
+    Retorna
+    -------
+    list
+        Los registros acumulados desde la última llamada.
+    """
+    with _lock:
+        records = list(_records)
+        _records.clear()
+    return records
+
+
+def add_records(records):
+    """
+    Agrega registros de otro proceso.
+
+    Parámetros
+    ----------
+    records : list
+        Registros obtenidos con ``collect``.
+    """
+    with _lock:
+        _records.extend(records)
+
+
+def reset():
+    """
+    Borra todos los registros de este proceso.
+    """
+    with _lock:
+        _records.clear()
+
+
+def summarize(records=None):
+    """
+    Resume los registros por tema y etapa.
+
+    Parámetros
+    ----------
+    records : list, optional
+        Registros a resumir; por defecto los de este proceso.
+
+    Retorna
+    -------
+    dict
+        ``{"stages": [...]}`` con llamadas, tiempo real, tiempo de CPU,
+        elementos, elementos por segundo, memoria residente máxima y
+        crecimiento del pico de memoria por cada tema y etapa.
+    """
+    if records is None:
+        records = get_records()
+    groups = {}
+    for record in records:
+        key = (record["topic"] or "", record["stage"])
+        group = groups.setdefault(
+            key,
+            {
+                "topic": record["topic"],
+                "stage": record["stage"],
+                "calls": 0,
+                "errors": 0,
+                "wall_seconds": 0.0,
+                "cpu_seconds": 0.0,
+                "items": None,
+                "rss_mb": None,
+                "peak_rss_mb": None,
+                "peak_rss_growth_mb": None,
+            },
+        )
+        group["calls"] += 1
+        group["errors"] += "error" in record
+        group["wall_seconds"] += record["wall_seconds"]
+        group["cpu_seconds"] += record["cpu_seconds"]
+        if record["items"] is not None:
+            group["items"] = (group["items"] or 0) + record["items"]
+        for field in ("rss_mb", "peak_rss_mb", "peak_rss_growth_mb"):
+            # Sin una fuente de memoria las medidas son ``None``.
+            if record[field] is not None:
+                group[field] = max(group[field] or 0.0, record[field])
+    stages = []
+    for key in sorted(groups):
+        group = groups[key]
+        group["items_per_second"] = (
+            group["items"] / group["wall_seconds"]
+            if group["items"] and group["wall_seconds"] > 0
+            else None
+        )
+        stages.append(group)
+    return {"generated_at": time.time(), "stages": stages}
+
+
+def _write(path, data):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=1)
+
+
+def write_summary(path=SUMMARY_PATH, records=None):
+    """
+    Guarda el resumen de la ejecución en un archivo JSON.
+
+    Parámetros
+    ----------
+    path : str, optional
+        Ruta del archivo.
+    records : list, optional
+        Registros a resumir; por defecto los de este proceso.
+
+    Véase También
+    -------------
+    summarize : Resume los registros por tema y etapa.
+    """
+    _write(path, summarize(records))
+
+
+def write_trace(path=TRACE_PATH, records=None):
+    """
+    Guarda los registros como una traza de eventos.
+
+    El archivo usa el formato ``Trace Event`` de Chrome, que pueden
+    abrir ``chrome://tracing``, Perfetto o speedscope, para ver en una
+    línea de tiempo qué etapa corría en cada proceso e hilo.
+
+    Parámetros
+    ----------
+    path : str, optional
+        Ruta del archivo.
+    records : list, optional
+        Registros a exportar; por defecto los de este proceso.
+    """
+    if records is None:
+        records = get_records()
+    events = [
+        {
+            "name": record["stage"],
+            "cat": record["topic"] or "pipeline",
+            "ph": "X",
+            "ts": record["start"] * 1e6,
+            "dur": record["wall_seconds"] * 1e6,
+            "pid": record["pid"],
+            "tid": record["thread"],
+            "args": {
+                "items": record["items"],
+                "cpu_seconds": record["cpu_seconds"],
+                "rss_mb": record["rss_mb"],
+            },
+        }
+        for record in records
+    ]
+    _write(path, {"traceEvents": events, "displayTimeUnit": "ms"})
+
+
+@contextlib.contextmanager
+def cprofile(path=CPROFILE_PATH, enabled=True):
+    """
+    Ejecuta un bloque con ``cProfile`` y guarda las estadísticas.
+
+    El archivo puede leerse con ``pstats`` o con ``snakeviz``. Sólo mide
+    el hilo principal del proceso actual; para los procesos de análisis
+    es mejor ``py-spy record --subprocesses``.
+
+    Parámetros
+    ----------
+    path : str, optional
+        Ruta del archivo ``.prof``.
+    enabled : bool, optional
+        Si es ``False`` el bloque se ejecuta sin medir.
+    """
+    if not enabled:
+        yield None
+        return
+    import cProfile
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        profiler.dump_stats(path)
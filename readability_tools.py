@@ -0,0 +1,164 @@
+import re
+from functools import lru_cache
+
+# Fórmula de Fernández-Huerta, la adaptación al español de la prueba de
+# Flesch que usa ``textstat`` con ``set_lang("es")``.
+FRE_BASE = 206.84
+FRE_SENTENCE_LENGTH = 1.02
+FRE_SYLLABLES_PER_100_WORDS = 0.6
+ROLLING_WINDOW = 10
+
+# ``textstat`` 0.7.3 quita por defecto (``rm_apostrophe=True``) toda la
+# puntuación, apóstrofos incluidos, antes de contar palabras y sílabas.
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_SENTENCE = re.compile(r"\b[^.!?]+[.!?]*")
+
+_pyphen = None
+
+
+def _get_pyphen():
+    global _pyphen
+    if _pyphen is None:
+        import pyphen
+
+        _pyphen = pyphen.Pyphen(lang="es")
+    return _pyphen
+
+
+@lru_cache(maxsize=200_000)
+def syllable_count(word):
+    """
+    Cuenta las sílabas de una palabra.
+
+    El resultado se memoriza por palabra, así que en un corpus grande
+    cada palabra distinta sólo se separa en sílabas una vez.
+
+    Parámetros
+    ----------
+    word : str
+        Palabra en minúsculas y sin signos de puntuación.
+
+    Retorna
+    -------
+    int
+        Número de sílabas.
+
+    Véase También
+    -------------
+    pyphen.Pyphen.positions : Posiciones de separación silábica de una palabra.
+    """
+    return len(_get_pyphen().positions(word)) + 1
+
+
+def _word_count(text):
+    return len(_PUNCTUATION.sub("", text).split())
+
+
+def count_sentence(text):
+    """
+    Cuenta oraciones, palabras y sílabas de una frase.
+
+    Sigue las reglas de ``textstat``: las oraciones de dos palabras o
+    menos no se cuentan y siempre hay al menos una oración.
+
+    Parámetros
+    ----------
+    text : str
+        La frase a analizar.
+
+    Retorna
+    -------
+    tuple
+        ``(oraciones, palabras, sílabas)``.
+    """
+    words = _PUNCTUATION.sub("", text.lower()).split()
+    syllables = sum(syllable_count(word) for word in words)
+    sentences = _SENTENCE.findall(text)
+    ignored = sum(1 for sentence in sentences if _word_count(sentence) <= 2)
+    return max(1, len(sentences) - ignored), len(words), syllables
+
+
+def _legacy_round(values, points):
+    import numpy as np
+
+    scale = 10**points
+    return np.floor(values * scale + np.copysign(0.5, values)) / scale
+
+
+def flesch_scores(sentences):
+    """
+    Calcula la legibilidad de Flesch (Fernández-Huerta) de varias frases.
+
+    Los conteos de cada frase se juntan en arreglos de NumPy y la fórmula
+    se evalúa para todo el corpus a la vez:
+    ``206.84 - 1.02 * palabras/oración - 0.6 * sílabas por 100 palabras``.
+
+    Parámetros
+    ----------
+    sentences : iterable
+        Frases a analizar.
+
+    Retorna
+    -------
+    numpy.ndarray
+        La legibilidad de cada frase, en el mismo orden.
+
+    Véase También
+    -------------
+    count_sentence : Cuenta oraciones, palabras y sílabas de una frase.
+    textstat.flesch_reading_ease : Analiza la legibilidad de una frase.
+    """
+    import numpy as np
+
+    counts = np.array(
+        [count_sentence(sentence) for sentence in sentences], dtype=float
+    )
+    if not len(counts):
+        return np.zeros(0)
+    sentence_total, words, syllables = counts.T
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sentence_length = np.where(words > 0, words / sentence_total, 0.0)
+        syllables_per_100 = np.where(words > 0, syllables * 100 / words, 0.0)
+    scores = (
+        FRE_BASE
+        - FRE_SENTENCE_LENGTH * _legacy_round(sentence_length, 1)
+        - FRE_SYLLABLES_PER_100_WORDS * _legacy_round(syllables_per_100, 1)
+    )
+    return _legacy_round(scores, 2)
+
+
+def summarize_scores(scores, window=ROLLING_WINDOW):
+    """
+    Resume la legibilidad de un corpus.
+
+    Parámetros
+    ----------
+    scores : array_like
+        Legibilidad de cada frase.
+    window : int, optional
+        Número de frases del promedio móvil.
+
+    Retorna
+    -------
+    dict
+        Promedio (``mean``), percentiles ``p10``, ``p25``, ``p50``,
+        ``p75`` y ``p90``, y el promedio móvil (``rolling``) con una
+        entrada por frase.
+    """
+    import numpy as np
+
+    scores = np.asarray(scores, dtype=float)
+    if not len(scores):
+        return {"mean": None, "rolling": []}
+    summary = {"mean": float(scores.mean())}
+    for percentile, value in zip(
+        (10, 25, 50, 75, 90), np.percentile(scores, [10, 25, 50, 75, 90])
+    ):
+        summary[f"p{percentile}"] = float(value)
+    cumulative = np.cumsum(np.insert(scores, 0, 0.0))
+    positions = np.arange(1, len(scores) + 1)
+    starts = np.maximum(positions - window, 0)
+    summary["rolling"] = (
+        (cumulative[positions] - cumulative[starts]) / (positions - starts)
+    ).tolist()
+    return summary
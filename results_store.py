@@ -0,0 +1,229 @@
+import functools
+import os
+import uuid
+
+STORE_PATH = "./resultados/store"
+
+# Columnas de cada tabla con su tipo de Arrow. Las tablas se escriben
+# particionadas por ``tema`` y ``fecha``.
+SCHEMAS = {
+    "palabras": [
+        ("timestamp", "timestamp[s]"),
+        ("palabra", "string"),
+        ("frecuencia", "int64"),
+    ],
+    "sentimientos": [
+        ("timestamp", "timestamp[s]"),
+        ("frase", "string"),
+        ("sentimiento", "string"),
+        ("prob_pos", "float32"),
+        ("prob_neg", "float32"),
+        ("prob_neu", "float32"),
+    ],
+    "legibilidad": [
+        ("timestamp", "timestamp[s]"),
+        ("posicion", "int32"),
+        ("flesch", "float64"),
+    ],
+}
+PARTITION_COLUMNS = [("tema", "string"), ("fecha", "string")]
+
+
+def _pyarrow():
+    # pyarrow se importa al primer uso para no retrasar el arranque.
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    return pa, ds
+
+
+@functools.lru_cache(maxsize=None)
+def _full_schema(table_name):
+    pa, _ = _pyarrow()
+    return pa.schema(
+        [
+            (column, pa.type_for_alias(alias))
+            for column, alias in SCHEMAS[table_name] + PARTITION_COLUMNS
+        ]
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _partitioning():
+    pa, ds = _pyarrow()
+    schema = pa.schema(
+        [(column, pa.type_for_alias(alias)) for column, alias in PARTITION_COLUMNS]
+    )
+    return ds.partitioning(schema, flavor="hive")
+
+
+def _timestamp(value):
+    pa, _ = _pyarrow()
+    return pa.scalar(value.replace(microsecond=0), pa.timestamp("s"))
+
+
+class ResultsStore:
+    """
+    Almacén columnar de los resultados de cada ejecución.
+
+    Guarda las palabras clave, los sentimientos por frase y la
+    legibilidad en tablas Parquet particionadas por tema y fecha
+    (``tema=.../fecha=AAAA-MM-DD``). Cada ejecución agrega archivos
+    nuevos sin reescribir los anteriores, y las consultas sólo leen las
+    particiones que coinciden con los temas y fechas pedidos.
+
+    Parámetros
+    ----------
+    root : str, optional
+        Carpeta raíz del almacén.
+    """
+
+    def __init__(self, root=STORE_PATH):
+        self.root = root
+
+    def _append(self, table_name, tema, timestamp, columns, rows=None):
+        # Las columnas pueden ser iterables de una sola pasada si se indica
+        # ``rows``; se convierten a Arrow sin pasar por una lista.
+        if rows is None:
+            rows = len(next(iter(columns.values()))) if columns else 0
+        if not rows:
+            return
+        pa, ds = _pyarrow()
+        schema = _full_schema(table_name)
+        columns = {
+            column: pa.array(values, type=schema.field(column).type, size=rows)
+            for column, values in columns.items()
+        }
+        columns["timestamp"] = [timestamp.replace(microsecond=0)] * rows
+        columns["tema"] = [tema] * rows
+        columns["fecha"] = [timestamp.strftime("%Y-%m-%d")] * rows
+        table = pa.table(columns, schema=schema)
+        ds.write_dataset(
+            table,
+            f"{self.root}/{table_name}",
+            format="parquet",
+            partitioning=_partitioning(),
+            basename_template=f"{uuid.uuid4().hex}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+        )
+
+    def append_keywords(self, tema, timestamp, keywords):
+        """
+        Agrega la frecuencia de palabras clave de una ejecución.
+
+        Parámetros
+        ----------
+        tema : str
+            El tema analizado.
+        timestamp : datetime
+            Fecha y hora del análisis.
+        keywords : dict
+            Diccionario ``palabra clave -> frecuencia``.
+        """
+        self._append(
+            "palabras",
+            tema,
+            timestamp,
+            {"palabra": list(keywords), "frecuencia": list(keywords.values())},
+        )
+
+    def append_sentiments(self, tema, timestamp, sentiment_result):
+        """
+        Agrega el sentimiento de cada frase de una ejecución.
+
+        Parámetros
+        ----------
+        tema : str
+            El tema analizado.
+        timestamp : datetime
+            Fecha y hora del análisis.
+        sentiment_result : text_tools.SentimentResult
+            Resultado del analizador de sentimientos.
+        """
+        probas = sentiment_result.probas
+        self._append(
+            "sentimientos",
+            tema,
+            timestamp,
+            {
+                "frase": iter(sentiment_result.sentences),
+                "sentimiento": sentiment_result.labels,
+                "prob_pos": (proba.get("POS") for proba in probas),
+                "prob_neg": (proba.get("NEG") for proba in probas),
+                "prob_neu": (proba.get("NEU") for proba in probas),
+            },
+            rows=len(sentiment_result),
+        )
+
+    def append_readability(self, tema, timestamp, scores):
+        """
+        Agrega la legibilidad de cada frase de una ejecución.
+
+        Parámetros
+        ----------
+        tema : str
+            El tema analizado.
+        timestamp : datetime
+            Fecha y hora del análisis.
+        scores : list
+            Legibilidad de cada frase, en orden.
+        """
+        self._append(
+            "legibilidad",
+            tema,
+            timestamp,
+            {
+                "posicion": range(len(scores)),
+                "flesch": (float(score) for score in scores),
+            },
+            rows=len(scores),
+        )
+
+    def query(self, table_name, temas=None, start=None, end=None, columns=None):
+        """
+        Consulta los resultados guardados.
+
+        Parámetros
+        ----------
+        table_name : str
+            ``"palabras"``, ``"sentimientos"`` o ``"legibilidad"``.
+        temas : list, optional
+            Temas a consultar; por defecto todos.
+        start : datetime, optional
+            Fecha y hora inicial (inclusiva).
+        end : datetime, optional
+            Fecha y hora final (inclusiva).
+        columns : list, optional
+            Columnas a leer; por defecto todas.
+
+        Retorna
+        -------
+        DataFrame
+            Las filas que cumplen los filtros.
+
+        Véase También
+        -------------
+        pyarrow.dataset.Dataset.to_table : Lee un conjunto de datos con filtros.
+        """
+        schema = _full_schema(table_name)
+        path = f"{self.root}/{table_name}"
+        if not os.path.isdir(path):
+            return schema.empty_table().to_pandas()
+        _, ds = _pyarrow()
+        dataset = ds.dataset(
+            path, format="parquet", partitioning=_partitioning(), schema=schema
+        )
+        filters = []
+        if temas is not None:
+            filters.append(ds.field("tema").isin(list(temas)))
+        # La fecha filtra particiones completas; el timestamp, las filas.
+        if start is not None:
+            filters.append(ds.field("fecha") >= start.strftime("%Y-%m-%d"))
+            filters.append(ds.field("timestamp") >= _timestamp(start))
+        if end is not None:
+            filters.append(ds.field("fecha") <= end.strftime("%Y-%m-%d"))
+            filters.append(ds.field("timestamp") <= _timestamp(end))
+        expression = None
+        for item in filters:
+            expression = item if expression is None else expression & item
+        return dataset.to_table(columns=columns, filter=expression).to_pandas()
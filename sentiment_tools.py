@@ -0,0 +1,410 @@
+import functools
+import os
+import time
+from collections import namedtuple
+
+import model_tools
+
+DEFAULT_BATCH_SIZE = 32
+DEFAULT_MAX_LENGTH = 128
+
+# Motor con el que se ejecuta el modelo de sentimientos:
+# "torch" (PyTorch), "onnx" (ONNX Runtime) u "onnx-int8" (ONNX Runtime
+# con los pesos cuantizados a int8). Los modelos ONNX se crean con
+# ``export_onnx``.
+SENTIMENT_BACKEND = os.environ.get("BINAHRIA_SENTIMENT_BACKEND", "torch")
+BACKENDS = ("torch", "onnx", "onnx-int8")
+ONNX_MODEL_DIR = "./modelos/sentiment_es_onnx"
+ONNX_MODEL_FILES = {"onnx": "model.onnx", "onnx-int8": "model.int8.onnx"}
+ONNX_OPSET = 14
+EVAL_SET_PATH = os.path.join(os.path.dirname(__file__), "data", "sentimiento_eval_es.txt")
+# Fracción mínima de frases con la misma etiqueta que PyTorch para
+# aceptar un motor ONNX.
+MIN_AGREEMENT = 0.97
+
+OnnxSentimentModel = namedtuple(
+    "OnnxSentimentModel", ["session", "tokenizer", "id2label", "input_names"]
+)
+OnnxSentimentModel.__doc__ = """
+Modelo de sentimientos exportado a ONNX.
+
+Atributos
+---------
+session : onnxruntime.InferenceSession
+    Sesión de ONNX Runtime del modelo.
+tokenizer : transformers.PreTrainedTokenizer
+    Tokenizador guardado junto al modelo.
+id2label : dict
+    Etiqueta de cada salida del modelo.
+input_names : list
+    Entradas que espera el modelo (por ejemplo ``input_ids``).
+"""
+
+_num_threads = None
+
+
+def _load_onnx_model(backend):
+    import onnxruntime as ort
+    from transformers import AutoConfig, AutoTokenizer
+
+    path = os.path.join(ONNX_MODEL_DIR, ONNX_MODEL_FILES[backend])
+    if not os.path.exists(path):
+        raise FileNotFoundError(
+            f"No existe {path}; créelo con sentiment_tools.export_onnx()"
+        )
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    if _num_threads:
+        options.intra_op_num_threads = _num_threads
+    session = ort.InferenceSession(
+        path, options, providers=["CPUExecutionProvider"]
+    )
+    config = AutoConfig.from_pretrained(ONNX_MODEL_DIR)
+    return OnnxSentimentModel(
+        session,
+        AutoTokenizer.from_pretrained(ONNX_MODEL_DIR),
+        {int(key): value for key, value in config.id2label.items()},
+        [item.name for item in session.get_inputs()],
+    )
+
+
+for _backend in ONNX_MODEL_FILES:
+    model_tools.register_model(
+        f"{model_tools.SENTIMENT_MODEL}_{_backend}",
+        functools.partial(_load_onnx_model, _backend),
+    )
+
+
+def model_name(backend=None):
+    """
+    Obtiene el nombre en ``model_tools`` del modelo de un motor.
+
+    Parámetros
+    ----------
+    backend : str, optional
+        Motor (``BACKENDS``); por defecto ``SENTIMENT_BACKEND``.
+
+    Retorna
+    -------
+    str
+        Nombre para ``model_tools.get_model``.
+    """
+    backend = backend or SENTIMENT_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Motor de sentimientos desconocido: {backend}")
+    if backend == "torch":
+        return model_tools.SENTIMENT_MODEL
+    return f"{model_tools.SENTIMENT_MODEL}_{backend}"
+
+
+def set_num_threads(num_threads, backend=None):
+    """
+    Limita los hilos que usa el modelo de sentimientos en CPU.
+
+    Con ONNX Runtime el límite se aplica a las sesiones que se creen
+    después de la llamada, así que debe indicarse antes de cargar el
+    modelo.
+
+    Parámetros
+    ----------
+    num_threads : int
+        Número de hilos para las operaciones internas del modelo.
+    backend : str, optional
+        Motor (``BACKENDS``); por defecto ``SENTIMENT_BACKEND``.
+
+    Véase También
+    -------------
+    torch.set_num_threads : Establece los hilos de paralelismo intra-operación.
+    """
+    global _num_threads
+    _num_threads = num_threads
+    if (backend or SENTIMENT_BACKEND) == "torch":
+        import torch
+
+        torch.set_num_threads(num_threads)
+
+
+def _length_buckets(lengths, batch_size):
+    """
+    Agrupa índices en lotes de frases con longitud similar.
+
+    Ordenar por longitud antes de partir en lotes reduce el relleno
+    (padding) que el modelo procesa inútilmente.
+
+    Parámetros
+    ----------
+    lengths : list
+        Número de tokens de cada frase.
+    batch_size : int
+        Tamaño máximo de cada lote.
+
+    Retorna
+    -------
+    list
+        Lista de lotes, cada uno con los índices originales de sus frases.
+    """
+    order = sorted(range(len(lengths)), key=lambda index: lengths[index])
+    return [order[i : i + batch_size] for i in range(0, len(order), batch_size)]
+
+
+def _torch_scorer(model):
+    import torch
+
+    model.eval()
+
+    def score(batch):
+        batch = {key: value.to(model.device) for key, value in batch.items()}
+        with torch.inference_mode():
+            return torch.softmax(model(**batch).logits, dim=-1).cpu().tolist()
+
+    return score
+
+
+def _onnx_scorer(onnx_model):
+    import numpy as np
+
+    session = onnx_model.session
+    input_names = onnx_model.input_names
+
+    def score(batch):
+        inputs = {name: batch[name].astype(np.int64) for name in input_names}
+        logits = session.run(None, inputs)[0]
+        logits = np.exp(logits - logits.max(axis=-1, keepdims=True))
+        return (logits / logits.sum(axis=-1, keepdims=True)).tolist()
+
+    return score
+
+
+def predict_batch(
+    sentences,
+    batch_size=DEFAULT_BATCH_SIZE,
+    max_length=DEFAULT_MAX_LENGTH,
+    num_threads=None,
+    backend=None,
+):
+    """
+    Predice el sentimiento de una lista de frases por lotes.
+
+    Usa directamente el modelo y el tokenizador del analizador de
+    ``pysentimiento`` (o su exportación a ONNX) para procesar varias
+    frases en cada pasada del transformer, en lugar de una por una como
+    ``analyzer.predict``. Los lotes se arman con frases de longitud
+    similar y el resultado se regresa en el orden original.
+
+    Parámetros
+    ----------
+    sentences : list
+        Frases a analizar.
+    batch_size : int, optional
+        Número de frases por pasada del modelo.
+    max_length : int, optional
+        Máximo de tokens por frase; las frases más largas se truncan.
+    num_threads : int, optional
+        Hilos a usar. Si no se indica se respeta la configuración actual.
+    backend : str, optional
+        Motor (``BACKENDS``); por defecto ``SENTIMENT_BACKEND``.
+
+    Retorna
+    -------
+    tuple
+        ``(labels, probas)``: etiqueta (``POS``, ``NEG`` o ``NEU``) y
+        diccionario de probabilidades de cada frase.
+
+    Véase También
+    -------------
+    model_tools.get_model : Obtiene el analizador de sentimientos compartido.
+    pysentimiento.preprocessing.preprocess_tweet : Normaliza el texto de un tweet.
+    """
+    from pysentimiento.preprocessing import preprocess_tweet
+
+    if not sentences:
+        return [], []
+    backend = backend or SENTIMENT_BACKEND
+    if num_threads:
+        set_num_threads(num_threads, backend)
+    model = model_tools.get_model(model_name(backend))
+    if backend == "torch":
+        tokenizer = model.tokenizer
+        id2label = model.model.config.id2label
+        lang = getattr(model, "lang", "es")
+        score = _torch_scorer(model.model)
+        tensors = "pt"
+    else:
+        tokenizer = model.tokenizer
+        id2label = model.id2label
+        lang = "es"
+        score = _onnx_scorer(model)
+        tensors = "np"
+    texts = [preprocess_tweet(sentence, lang=lang) for sentence in sentences]
+    encoded = tokenizer(texts, truncation=True, max_length=max_length)
+    lengths = [len(ids) for ids in encoded["input_ids"]]
+    labels = [None] * len(texts)
+    probas = [None] * len(texts)
+    for bucket in _length_buckets(lengths, batch_size):
+        features = [
+            {key: encoded[key][index] for key in encoded.keys()}
+            for index in bucket
+        ]
+        batch = tokenizer.pad(features, padding="longest", return_tensors=tensors)
+        for index, row in zip(bucket, score(batch)):
+            row_probas = {id2label[i]: value for i, value in enumerate(row)}
+            probas[index] = row_probas
+            labels[index] = max(row_probas, key=row_probas.get)
+    return labels, probas
+
+
+def export_onnx(output_dir=ONNX_MODEL_DIR, opset=ONNX_OPSET, quantize=True):
+    """
+    Exporta el modelo de sentimientos de PyTorch a ONNX.
+
+    Guarda el modelo con ejes dinámicos de lote y longitud, junto con el
+    tokenizador y la configuración (etiquetas), de modo que el motor
+    ``"onnx"`` no necesite cargar el modelo de PyTorch. Con ``quantize``
+    también guarda una copia con cuantización dinámica a int8 de los
+    pesos (motor ``"onnx-int8"``), más pequeña y rápida en CPU.
+
+    Parámetros
+    ----------
+    output_dir : str, optional
+        Carpeta de salida.
+    opset : int, optional
+        Versión del conjunto de operadores de ONNX.
+    quantize : bool, optional
+        Si también se crea el modelo cuantizado.
+
+    Retorna
+    -------
+    dict
+        Ruta de cada modelo creado, por motor.
+
+    Véase También
+    -------------
+    torch.onnx.export : Exporta un modelo de PyTorch a ONNX.
+    onnxruntime.quantization.quantize_dynamic : Cuantiza los pesos de un modelo ONNX.
+    """
+    import torch
+
+    analyzer = model_tools.get_model(model_tools.SENTIMENT_MODEL)
+    model = analyzer.model.eval()
+    tokenizer = analyzer.tokenizer
+    sample = tokenizer(["texto de ejemplo para exportar"], return_tensors="pt")
+    input_names = list(sample.keys())
+
+    class LogitsOnly(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.model = model
+
+        def forward(self, *inputs):
+            return self.model(**dict(zip(input_names, inputs))).logits
+
+    os.makedirs(output_dir, exist_ok=True)
+    paths = {"onnx": os.path.join(output_dir, ONNX_MODEL_FILES["onnx"])}
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["logits"] = {0: "batch"}
+    with torch.no_grad():
+        torch.onnx.export(
+            LogitsOnly(),
+            tuple(sample[name] for name in input_names),
+            paths["onnx"],
+            input_names=input_names,
+            output_names=["logits"],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+            do_constant_folding=True,
+        )
+    tokenizer.save_pretrained(output_dir)
+    model.config.save_pretrained(output_dir)
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        paths["onnx-int8"] = os.path.join(output_dir, ONNX_MODEL_FILES["onnx-int8"])
+        quantize_dynamic(paths["onnx"], paths["onnx-int8"], weight_type=QuantType.QInt8)
+    # Si ya se habían cargado, la siguiente llamada usa los modelos nuevos.
+    for backend in paths:
+        model_tools.evict_model(model_name(backend))
+    return paths
+
+
+def load_eval_set(path=EVAL_SET_PATH):
+    """
+    Carga el conjunto fijo de frases para comparar motores.
+
+    Parámetros
+    ----------
+    path : str, optional
+        Archivo con una frase por línea.
+
+    Retorna
+    -------
+    list
+        Las frases, sin líneas vacías.
+    """
+    with open(path, encoding="utf8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def check_agreement(
+    sentences=None,
+    backend="onnx-int8",
+    reference="torch",
+    batch_size=DEFAULT_BATCH_SIZE,
+    max_length=DEFAULT_MAX_LENGTH,
+):
+    """
+    Compara las predicciones de un motor con las de otro.
+
+    Parámetros
+    ----------
+    sentences : list, optional
+        Frases a comparar; por defecto ``load_eval_set()``.
+    backend : str, optional
+        Motor a evaluar.
+    reference : str, optional
+        Motor de referencia.
+    batch_size : int, optional
+        Número de frases por pasada del modelo.
+    max_length : int, optional
+        Máximo de tokens por frase.
+
+    Retorna
+    -------
+    dict
+        ``agreement`` (fracción de frases con la misma etiqueta),
+        ``accepted`` (si alcanza ``MIN_AGREEMENT``), la diferencia máxima
+        y promedio entre probabilidades, los segundos de cada motor y
+        las frases en las que no coinciden.
+    """
+    if sentences is None:
+        sentences = load_eval_set()
+    results = {}
+    seconds = {}
+    for name in (reference, backend):
+        model_tools.get_model(model_name(name))
+        start = time.perf_counter()
+        results[name] = predict_batch(
+            sentences, batch_size=batch_size, max_length=max_length, backend=name
+        )
+        seconds[name] = time.perf_counter() - start
+    reference_labels, reference_probas = results[reference]
+    labels, probas = results[backend]
+    differences = [
+        abs(proba[label] - reference_proba[label])
+        for proba, reference_proba in zip(probas, reference_probas)
+        for label in reference_proba
+    ]
+    disagreements = [
+        {"sentence": sentence, reference: expected, backend: label}
+        for sentence, expected, label in zip(sentences, reference_labels, labels)
+        if expected != label
+    ]
+    agreement = 1 - len(disagreements) / len(sentences) if sentences else 1.0
+    return {
+        "sentences": len(sentences),
+        "agreement": agreement,
+        "accepted": agreement >= MIN_AGREEMENT,
+        "max_proba_diff": max(differences, default=0.0),
+        "mean_proba_diff": sum(differences) / len(differences) if differences else 0.0,
+        "seconds": seconds,
+        "disagreements": disagreements,
+    }
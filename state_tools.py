@@ -0,0 +1,336 @@
+import hashlib
+import json
+import operator
+import os
+import re
+import time
+
+import keyword_tools
+
+STATE_DIR = "./estado"
+CHECKPOINT_PATH = "./estado/checkpoint.json"
+# Número máximo de valores de legibilidad que se guardan por tema para
+# la gráfica de puntos; el promedio acumulado usa todos.
+READABILITY_HISTORY = 5000
+# Palabras que guarda el resumen acumulado de la nube de palabras.
+TOKEN_CAPACITY = 10000
+
+
+def _write_json(path, data):
+    """
+    Escribe un archivo JSON de forma atómica.
+
+    Se escribe primero en un archivo temporal y después se reemplaza el
+    original, para que una interrupción nunca deje el estado a medias.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def _topic_path(tema, state_dir):
+    slug = re.sub(r"[^\w]+", "_", tema).strip("_") or "tema"
+    digest = hashlib.sha1(tema.encode("utf8")).hexdigest()[:8]
+    return os.path.join(state_dir, f"{slug}_{digest}.json")
+
+
+def new_topic_state():
+    """
+    Crea el estado vacío de un tema.
+
+    Retorna
+    -------
+    dict
+        Último tweet procesado y los acumulados de sentimientos,
+        palabras clave y legibilidad.
+    """
+    return {
+        "last_tweet_id": None,
+        "last_run": None,
+        "tweets": 0,
+        "sentiments": {"Positive": 0, "Negative": 0, "Neutral": 0},
+        "keywords": {},
+        "readability": {"count": 0, "sum": 0.0, "history": []},
+    }
+
+
+def load_topic_state(tema, state_dir=STATE_DIR):
+    """
+    Carga el estado acumulado de un tema.
+
+    Parámetros
+    ----------
+    tema : str
+        El tema (hashtag).
+    state_dir : str, optional
+        Carpeta donde se guardan los estados.
+
+    Retorna
+    -------
+    dict
+        El estado guardado, o uno vacío si el tema no se ha procesado.
+    """
+    path = _topic_path(tema, state_dir)
+    if not os.path.exists(path):
+        return new_topic_state()
+    with open(path, encoding="utf8") as f:
+        state = json.load(f)
+    return {**new_topic_state(), **state}
+
+
+def save_topic_state(tema, state, state_dir=STATE_DIR):
+    """
+    Guarda el estado acumulado de un tema.
+
+    Parámetros
+    ----------
+    tema : str
+        El tema (hashtag).
+    state : dict
+        El estado a guardar.
+    state_dir : str, optional
+        Carpeta donde se guardan los estados.
+    """
+    _write_json(_topic_path(tema, state_dir), state)
+
+
+def cumulative_token_frequencies(state):
+    """
+    Obtiene la frecuencia acumulada de las palabras de un tema.
+
+    Parámetros
+    ----------
+    state : dict
+        Estado del tema.
+
+    Retorna
+    -------
+    dict
+        Conteo (aproximado, ver ``keyword_tools.SpaceSaving``) de las
+        ``TOKEN_CAPACITY`` palabras más frecuentes de todas las
+        ejecuciones.
+    """
+    if "token_sketch" not in state:
+        return {}
+    sketch = keyword_tools.SpaceSaving.from_dict(state["token_sketch"])
+    return {token: count for token, count, _ in sketch.top()}
+
+
+def is_new_tweet(state, tweet_id):
+    """
+    Indica si un tweet es posterior al último procesado del tema.
+
+    Parámetros
+    ----------
+    state : dict
+        Estado del tema.
+    tweet_id : str
+        Identificador del tweet.
+
+    Retorna
+    -------
+    bool
+        ``True`` si el tweet no se ha procesado.
+    """
+    last_tweet_id = state["last_tweet_id"]
+    return last_tweet_id is None or int(tweet_id) > int(last_tweet_id)
+
+
+def _add_to_sketch(state, field, frequencies, capacity):
+    if field in state:
+        sketch = keyword_tools.SpaceSaving.from_dict(state[field])
+    else:
+        sketch = keyword_tools.SpaceSaving(capacity)
+    run_sketch = keyword_tools.SpaceSaving(capacity)
+    for item, count in frequencies.items():
+        if count > 0:
+            run_sketch.add(item, count)
+    sketch = sketch.merge(run_sketch)
+    state[field] = sketch.to_dict()
+    return sketch
+
+
+def merge_results(
+    state,
+    tweet_ids,
+    sentiments,
+    keywords,
+    readability,
+    keyword_capacity=None,
+    similarity_threshold=0.5,
+    token_frequencies=None,
+):
+    """
+    Suma los resultados de una ejecución al estado de un tema.
+
+    Las palabras clave acumuladas se vuelven a agrupar con
+    ``keyword_tools.cluster_keywords``, porque dos palabras casi
+    idénticas que aparecen en ejecuciones distintas nunca se compararon
+    entre sí.
+
+    Parámetros
+    ----------
+    state : dict
+        Estado del tema; se modifica en el lugar.
+    tweet_ids : list
+        Identificadores de los tweets procesados en esta ejecución.
+    sentiments : dict
+        Conteo de sentimientos de esta ejecución.
+    keywords : dict
+        Frecuencia de palabras clave de esta ejecución.
+    readability : list
+        Legibilidad de cada frase de esta ejecución.
+    keyword_capacity : int, optional
+        Si se indica, las palabras clave acumuladas se guardan en un
+        resumen ``keyword_tools.SpaceSaving`` de este tamaño
+        (``keyword_sketch``) en lugar de crecer con cada ejecución, y
+        ``keywords`` tiene sólo sus palabras de mayor conteo.
+    similarity_threshold : float, optional
+        Similitud a partir de la cual dos palabras clave se consideran la
+        misma; debe ser la usada al extraerlas.
+    token_frequencies : dict, optional
+        Frecuencia de cada palabra de esta ejecución; se acumula en un
+        resumen de ``TOKEN_CAPACITY`` palabras (``token_sketch``) para la
+        nube de palabras.
+
+    Retorna
+    -------
+    dict
+        El estado actualizado.
+    """
+    if tweet_ids:
+        last_tweet_id = max(int(tweet_id) for tweet_id in tweet_ids)
+        if state["last_tweet_id"] is not None:
+            last_tweet_id = max(last_tweet_id, int(state["last_tweet_id"]))
+        state["last_tweet_id"] = str(last_tweet_id)
+    state["last_run"] = time.time()
+    state["tweets"] += len(tweet_ids)
+    for label, count in sentiments.items():
+        state["sentiments"][label] = state["sentiments"].get(label, 0) + count
+    if keyword_capacity is None:
+        total_keywords = state["keywords"]
+        for keyword, count in keywords.items():
+            total_keywords[keyword] = total_keywords.get(keyword, 0) + count
+    else:
+        if "keyword_sketch" not in state:
+            # Estados anteriores sólo tienen los conteos exactos.
+            _add_to_sketch(state, "keyword_sketch", state["keywords"], keyword_capacity)
+        sketch = _add_to_sketch(state, "keyword_sketch", keywords, keyword_capacity)
+        total_keywords = {keyword: count for keyword, count, _ in sketch.top()}
+    total_keywords = keyword_tools.cluster_keywords(total_keywords, similarity_threshold)
+    state["keywords"] = dict(
+        sorted(total_keywords.items(), key=operator.itemgetter(1), reverse=True)
+    )
+    if token_frequencies is not None:
+        _add_to_sketch(state, "token_sketch", token_frequencies, TOKEN_CAPACITY)
+    total_readability = state["readability"]
+    total_readability["count"] += len(readability)
+    total_readability["sum"] += float(sum(readability))
+    history = total_readability["history"] + [float(value) for value in readability]
+    total_readability["history"] = history[-READABILITY_HISTORY:]
+    return state
+
+
+class Checkpoint:
+    """
+    Avance de un lote de temas.
+
+    Registra qué temas del lote ya terminaron y cuáles fallaron (y ya se
+    registraron en el log) para que, si la ejecución se interrumpe, la
+    siguiente continúe donde se quedó en lugar de empezar desde el
+    principio. El avance sólo se reutiliza si la lista de temas es la
+    misma, y debe eliminarse con ``clear`` cuando la ejecución termina
+    normalmente, para que la siguiente ejecución programada procese
+    todo el lote (incluidos los temas que fallaron).
+
+    Parámetros
+    ----------
+    temas : list
+        Temas del lote.
+    path : str, optional
+        Ruta del archivo de avance.
+    """
+
+    def __init__(self, temas, path=CHECKPOINT_PATH):
+        self.path = path
+        batch = json.dumps(list(temas)).encode("utf8")
+        self.batch = hashlib.sha1(batch).hexdigest()
+        self.completed = set()
+        self.failed = set()
+        if os.path.exists(path):
+            with open(path, encoding="utf8") as f:
+                data = json.load(f)
+            if data.get("batch") == self.batch:
+                self.completed = set(data.get("completed", []))
+                self.failed = set(data.get("failed", []))
+
+    def pending(self, temas):
+        """
+        Filtra los temas que aún no terminan ni fallan.
+
+        Parámetros
+        ----------
+        temas : list
+            Temas del lote.
+
+        Retorna
+        -------
+        list
+            Temas pendientes, en el mismo orden.
+        """
+        return [
+            tema
+            for tema in temas
+            if tema not in self.completed and tema not in self.failed
+        ]
+
+    def mark_done(self, tema):
+        """
+        Registra que un tema terminó.
+
+        Parámetros
+        ----------
+        tema : str
+            El tema terminado.
+        """
+        self.completed.add(tema)
+        self.failed.discard(tema)
+        self._save()
+
+    def mark_failed(self, tema):
+        """
+        Registra que un tema falló.
+
+        Al continuar una ejecución interrumpida el tema no se vuelve a
+        intentar; se intenta de nuevo en la siguiente ejecución del lote.
+
+        Parámetros
+        ----------
+        tema : str
+            El tema que falló.
+        """
+        self.failed.add(tema)
+        self._save()
+
+    def _save(self):
+        _write_json(
+            self.path,
+            {
+                "batch": self.batch,
+                "completed": sorted(self.completed),
+                "failed": sorted(self.failed),
+            },
+        )
+
+    def clear(self):
+        """
+        Elimina el avance al terminar la ejecución del lote.
+        """
+        self.completed = set()
+        self.failed = set()
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,52 @@
+import cache_tools
+
+
+def _upper(calls, consumed):
+    def compute(sentences):
+        calls.append(1)
+        for sentence in sentences:
+            consumed.append(sentence)
+            yield sentence.upper()
+
+    return compute
+
+
+def test_cached_iter_streams_misses_through_one_call(tmp_path):
+    cache = cache_tools.ResultCache(str(tmp_path / "cache.sqlite3"))
+    sentences = [f"frase {index}" for index in range(20)]
+    cache.put_many("upper", "1", [(sentence, sentence.upper()) for sentence in sentences[4:9]])
+    calls, consumed = [], []
+    results = cache_tools.cached_iter(
+        cache, "upper", "1", iter(sentences), _upper(calls, consumed), chunk_size=6
+    )
+    assert next(results) == "FRASE 0"
+    assert consumed == sentences[:1]
+    assert list(results) == [sentence.upper() for sentence in sentences[1:]]
+    assert calls == [1]
+    assert consumed == sentences[:4] + sentences[9:]
+    calls.clear()
+    consumed.clear()
+    assert list(
+        cache_tools.cached_iter(cache, "upper", "1", sentences, _upper(calls, consumed), chunk_size=6)
+    ) == [sentence.upper() for sentence in sentences]
+    assert consumed == []
+    assert cache.stats()["entries"] == 20
+    cache.close()
+
+
+def test_cached_iter_without_cache():
+    calls, consumed = [], []
+    sentences = (f"frase {index}" for index in range(5))
+    assert list(cache_tools.cached_iter(None, "upper", "1", sentences, _upper(calls, consumed))) == [
+        f"FRASE {index}" for index in range(5)
+    ]
+    assert calls == [1]
+
+
+def test_result_cache_evicts_oldest_entries(tmp_path):
+    cache = cache_tools.ResultCache(str(tmp_path / "cache.sqlite3"), max_entries=5)
+    for index in range(8):
+        cache.put_many("upper", "1", [(f"frase {index}", index)])
+    assert cache.stats()["entries"] == 5
+    assert cache.get_many("upper", "1", ["frase 0", "frase 7"]) == {1: 7}
+    cache.close()
@@ -0,0 +1,22 @@
+import corpus_tools
+
+DOCUMENTS = ["Hola mundo 😂\n\nadiós", "RT ñandú: hola", "Hola mundo 😂", "a\ud83db"]
+
+
+def test_build_corpus_round_trip():
+    corpus = corpus_tools.build_corpus(DOCUMENTS)
+    expected = list(corpus_tools.split_sentences(DOCUMENTS))
+    assert len(corpus) == len(expected)
+    assert list(corpus.sentences) == expected
+    assert [corpus[index] for index in range(len(corpus))] == expected
+    assert corpus.sentences[1:3] == expected[1:3]
+
+
+def test_unique_sentences_and_weights():
+    corpus = corpus_tools.build_corpus(DOCUMENTS)
+    unique = list(dict.fromkeys(corpus_tools.split_sentences(DOCUMENTS)))
+    assert list(corpus.unique_sentences) == unique
+    assert list(corpus.weights) == [2, 1, 1, 1]
+    assert corpus.expand([sentence.upper() for sentence in corpus.unique_sentences]) == [
+        sentence.upper() for sentence in corpus.sentences
+    ]
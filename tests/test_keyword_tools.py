@@ -0,0 +1,141 @@
+import collections
+import itertools
+import json
+import random
+
+import pytest
+
+import keyword_tools
+
+
+def _levenshtein(source, target):
+    previous = list(range(len(target) + 1))
+    for row, char in enumerate(source, 1):
+        current = [row]
+        for col, other in enumerate(target, 1):
+            current.append(
+                min(previous[col] + 1, current[col - 1] + 1, previous[col - 1] + (char != other))
+            )
+        previous = current
+    return previous[-1]
+
+
+def _random_words(rng, count, alphabet="abc ", max_length=6):
+    return [
+        "".join(rng.choice(alphabet) for _ in range(rng.randint(0, max_length)))
+        for _ in range(count)
+    ]
+
+
+def test_find_overlapping_keywords():
+    index = keyword_tools.KeywordIndex(["he", "she", "his", "hers"])
+    assert index.find("ushers") == {0, 1, 3}
+    assert index.find("") == set()
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_count_sentences_matches_substring_search(seed):
+    rng = random.Random(seed)
+    keywords = [word for word in _random_words(rng, 30, max_length=4) if word]
+    sentences = _random_words(rng, 50, max_length=20)
+    weights = [rng.randint(1, 5) for _ in sentences]
+    expected = {}
+    for keyword in keywords:
+        expected[keyword] = sum(
+            weight for sentence, weight in zip(sentences, weights) if keyword in sentence
+        )
+    counts = keyword_tools.KeywordIndex(keywords).count_sentences(sentences, weights)
+    assert counts == expected
+    assert list(counts) == list(dict.fromkeys(keywords))
+
+
+def test_bounded_levenshtein_matches_full_dp():
+    rng = random.Random(0)
+    words = _random_words(rng, 60, alphabet="abcd", max_length=7) + ["", "reforma", "reformas"]
+    for source, target in itertools.product(words, repeat=2):
+        distance = _levenshtein(source, target)
+        for max_distance in range(5):
+            expected = distance if distance <= max_distance else max_distance + 1
+            assert keyword_tools.bounded_levenshtein(source, target, max_distance) == expected
+
+
+def test_cluster_keywords_representatives():
+    found = {"planb": 3, "reforma": 10, "reformas": 5, "la reforma": 4, "ine": 10}
+    assert keyword_tools.cluster_keywords(found) == {"reforma": 12, "ine": 10, "planb": 3}
+    assert keyword_tools.cluster_keywords(found, threshold=0.95) == {
+        "reforma": 10,
+        "ine": 10,
+        "reformas": 5,
+        "la reforma": 4,
+        "planb": 3,
+    }
+
+
+def _zipf_stream(seed, length=3000, distinct=400):
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(distinct)]
+    return rng.choices([f"p{rank}" for rank in range(distinct)], weights, k=length)
+
+
+def _check_bounds(sketch, stream):
+    true_counts = collections.Counter(stream)
+    assert len(sketch) <= sketch.capacity
+    assert sketch.total == len(stream)
+    for item, count, error in sketch.top():
+        assert count - error <= true_counts[item] <= count
+        assert error <= sketch.error_bound
+    for item, count in true_counts.items():
+        if count > sketch.error_bound:
+            assert item in sketch
+
+
+def test_space_saving_bounds():
+    for seed in range(10):
+        stream = _zipf_stream(seed)
+        sketch = keyword_tools.SpaceSaving(50)
+        sketch.update(stream)
+        _check_bounds(sketch, stream)
+
+
+def test_space_saving_merge():
+    for seed in range(10):
+        first, second = _zipf_stream(seed), _zipf_stream(seed + 100, length=2000)
+        left = keyword_tools.SpaceSaving(50)
+        left.update(first)
+        right = keyword_tools.SpaceSaving(30)
+        right.update(second)
+        _check_bounds(left.merge(right), first + second)
+
+
+def test_space_saving_serialization():
+    first, second = _zipf_stream(0), _zipf_stream(1)
+    sketch = keyword_tools.SpaceSaving(20)
+    sketch.update(first)
+    data = json.loads(json.dumps(sketch.to_dict()))
+    restored = keyword_tools.SpaceSaving.from_dict(data)
+    assert restored.capacity == sketch.capacity
+    assert restored.total == sketch.total
+    assert restored.top() == sketch.top()
+    restored.update(second)
+    _check_bounds(restored, first + second)
+
+
+@pytest.mark.parametrize("threshold", [0.3, 0.5, 0.6, 0.7, 0.9])
+@pytest.mark.parametrize("length", [10, 20])
+def test_max_distance_is_exclusive(threshold, length):
+    expected = max(
+        (distance for distance in range(length + 1) if 1 - distance / length > threshold),
+        default=-1,
+    )
+    assert keyword_tools._max_distance(length, threshold) == expected
+
+
+def test_cluster_keywords_keeps_pairs_at_the_threshold():
+    # Similitud de exactamente 0.7: no supera el umbral.
+    assert keyword_tools.cluster_keywords({"abcdefghij": 5, "abcdefgxyz": 3}, 0.7) == {
+        "abcdefghij": 5,
+        "abcdefgxyz": 3,
+    }
+    assert keyword_tools.cluster_keywords({"abcdefghij": 5, "abcdefghyz": 3}, 0.7) == {
+        "abcdefghij": 6,
+    }
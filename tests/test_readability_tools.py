@@ -0,0 +1,35 @@
+import pytest
+
+import readability_tools
+
+textstat = pytest.importorskip("textstat")
+pytest.importorskip("pyphen")
+
+SENTENCES = [
+    "'hola' dijo el niño. ¿Qué tal?",
+    "l'amour y d'Artagnan son 'raros'",
+    "Él dijo: 'no voy' y se fue!!! Adiós.",
+    "La reforma afecta a los trabajadores #PlanB @usuario1 https://t.co/abc",
+    "Sí.",
+    "",
+]
+
+
+@pytest.fixture(autouse=True)
+def spanish():
+    textstat.set_lang("es")
+
+
+@pytest.mark.parametrize("sentence", SENTENCES)
+def test_count_sentence_matches_textstat(sentence):
+    expected = (
+        textstat.sentence_count(sentence),
+        textstat.lexicon_count(sentence),
+        textstat.syllable_count(sentence),
+    )
+    assert readability_tools.count_sentence(sentence) == expected
+
+
+def test_flesch_scores_match_textstat():
+    scores = readability_tools.flesch_scores(SENTENCES[:-1])
+    assert scores.tolist() == [textstat.flesch_reading_ease(sentence) for sentence in SENTENCES[:-1]]
@@ -0,0 +1,66 @@
+import state_tools
+
+TEMAS = ["A", "B", "C"]
+
+
+def test_failed_topics_do_not_stay_pending(tmp_path):
+    path = str(tmp_path / "checkpoint.json")
+    checkpoint = state_tools.Checkpoint(TEMAS, path)
+    checkpoint.mark_done("A")
+    checkpoint.mark_failed("B")
+    checkpoint.mark_done("C")
+    assert checkpoint.pending(TEMAS) == []
+    resumed = state_tools.Checkpoint(TEMAS, path)
+    assert resumed.pending(TEMAS) == []
+    resumed.clear()
+    assert state_tools.Checkpoint(TEMAS, path).pending(TEMAS) == TEMAS
+
+
+def test_interrupted_run_resumes(tmp_path):
+    path = str(tmp_path / "checkpoint.json")
+    checkpoint = state_tools.Checkpoint(TEMAS, path)
+    checkpoint.mark_failed("A")
+    checkpoint.mark_done("B")
+    assert state_tools.Checkpoint(TEMAS, path).pending(TEMAS) == ["C"]
+    checkpoint.mark_done("A")
+    assert checkpoint.failed == set()
+
+
+def test_new_batch_resets_progress(tmp_path):
+    path = str(tmp_path / "checkpoint.json")
+    state_tools.Checkpoint(TEMAS, path).mark_done("A")
+    temas = ["A", "D"]
+    assert state_tools.Checkpoint(temas, path).pending(temas) == temas
+
+
+def test_merge_results_keyword_capacity():
+    exact = state_tools.new_topic_state()
+    sketched = state_tools.new_topic_state()
+    runs = [{"hola": 5, "mundo": 3, "adiós": 1}, {"mundo": 4, "nuevo": 2, "hola": 0}]
+    for number, keywords in enumerate(runs):
+        ids = [str(number)]
+        state_tools.merge_results(exact, ids, {}, keywords, [])
+        state_tools.merge_results(sketched, ids, {}, keywords, [], keyword_capacity=10)
+    assert sketched["keywords"] == exact["keywords"]
+    assert list(sketched["keywords"]) == ["mundo", "hola", "nuevo", "adiós"]
+    bounded = state_tools.new_topic_state()
+    for number, keywords in enumerate(runs):
+        state_tools.merge_results(bounded, [str(number)], {}, keywords, [], keyword_capacity=2)
+    assert len(bounded["keywords"]) == 2
+    assert list(bounded["keywords"])[0] == "mundo"
+
+
+def test_merge_results_clusters_keywords_across_runs():
+    for capacity in (None, 10):
+        state = state_tools.new_topic_state()
+        state_tools.merge_results(state, ["1"], {}, {"reforma": 10}, [], keyword_capacity=capacity)
+        state_tools.merge_results(state, ["2"], {}, {"reformas": 8}, [], keyword_capacity=capacity)
+        assert state["keywords"] == {"reforma": 11}
+
+
+def test_merge_results_token_frequencies():
+    state = state_tools.new_topic_state()
+    assert state_tools.cumulative_token_frequencies(state) == {}
+    state_tools.merge_results(state, ["1"], {}, {}, [], token_frequencies={"hola": 2, "mundo": 1})
+    state_tools.merge_results(state, ["2"], {}, {}, [], token_frequencies={"mundo": 3})
+    assert state_tools.cumulative_token_frequencies(state) == {"mundo": 4, "hola": 2}
@@ -0,0 +1,38 @@
+import random
+
+import text_tools
+
+WORDS = ["casa", "perro", "gato", "árbol", "río", "sol", "luna", "mar", "nube", "flor"]
+
+
+def _documents(seed, count=300):
+    rng = random.Random(seed)
+    return [
+        " ".join(rng.choices(WORDS, [1 / (rank + 1) for rank in range(len(WORDS))], k=4))
+        for _ in range(count)
+    ]
+
+
+def _first_word(sentences, batch_size, n_process):
+    for sentence in sentences:
+        yield [sentence.split()[0]]
+
+
+def test_top_k_matches_full_mode_when_all_keywords_are_candidates(monkeypatch):
+    monkeypatch.setattr(text_tools, "extract_keywords", _first_word)
+    for seed in range(5):
+        documents = _documents(seed)
+        full = text_tools.get_frecuency_key_words(documents)
+        top = text_tools.get_frecuency_key_words(documents, top_k=3, sketch_capacity=len(WORDS))
+        assert top == dict(list(full.items())[:3])
+
+
+def test_top_k_candidates_are_chosen_by_extractions(monkeypatch):
+    # "mar" está en todas las frases pero sólo se extrae de una: el modo
+    # completo la reporta primero y el modo top_k la descarta.
+    monkeypatch.setattr(text_tools, "extract_keywords", _first_word)
+    documents = ["mar"] + ["casa mar"] * 5 + ["perro mar"] * 4 + ["gato mar"] * 3
+    full = text_tools.get_frecuency_key_words(documents)
+    assert list(full)[0] == "mar"
+    top = text_tools.get_frecuency_key_words(documents, top_k=1, sketch_capacity=3)
+    assert top == {"casa": 5}
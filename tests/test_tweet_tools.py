@@ -0,0 +1,44 @@
+import json
+
+import pytest
+
+import tweet_tools
+
+RECORDS = {
+    "1": {"tweet_details": {"full_text": "Hola árbol \"citado\" \\ fin", "retweet_count": 12}},
+    "2": {"tweet_details": {"full_text": "😂 #Reforma\nsegunda línea"}, "user_details": {}},
+    "3": {"tweet_url": "https://t.co/x", "tweet_details": {"full_text": ""}},
+    "4": 12345,
+    "5": [1, 2.5e10, None, True, {"a": "}"}],
+}
+
+
+@pytest.fixture
+def scrape_file(tmp_path):
+    path = tmp_path / "descarga.json"
+    # Escapes ASCII como el scraper, con espacios y saltos de línea entre
+    # elementos para cubrir los cortes de bloque en cualquier posición.
+    path.write_text(json.dumps(RECORDS, indent=2).replace(": ", " :  "), encoding="latin1")
+    return str(path)
+
+
+@pytest.mark.parametrize("chunk_size", range(1, 8))
+def test_iter_tweets_matches_json_load(scrape_file, chunk_size):
+    with open(scrape_file, encoding="latin1") as f:
+        expected = json.load(f)
+    tweets = list(tweet_tools.iter_tweets(scrape_file, chunk_size=chunk_size))
+    assert [tweet.id for tweet in tweets] == list(expected)
+    assert [tweet.details for tweet in tweets] == list(expected.values())
+    assert tweets[0].full_text == expected["1"]["tweet_details"]["full_text"]
+    assert tweets[3].full_text == ""
+
+
+@pytest.mark.parametrize("chunk_size", range(1, 8))
+def test_iter_tweets_empty_and_truncated(tmp_path, chunk_size):
+    empty = tmp_path / "vacio.json"
+    empty.write_text(" { } ", encoding="latin1")
+    assert list(tweet_tools.iter_tweets(str(empty), chunk_size=chunk_size)) == []
+    truncated = tmp_path / "truncado.json"
+    truncated.write_text('{"1": {"tweet_details": {"full_text": "a"}}, "2": 1', encoding="latin1")
+    with pytest.raises(json.JSONDecodeError):
+        list(tweet_tools.iter_tweets(str(truncated), chunk_size=chunk_size))
@@ -1,12 +1,83 @@
 import operator
-import pytextrank
-import spacy
-import textstat
-from hermetrics.levenshtein import Levenshtein
-from pysentimiento import create_analyzer
 
+import cache_tools
+import corpus_tools
+import keyword_tools
+import model_tools
+import profile_tools
+import readability_tools
+import sentiment_tools
 
-def get_frecuency_key_words(text):
+# Componentes de spaCy que requiere TextRank: etiquetas gramaticales y
+# lemas para el grafo, el parser para los ``noun_chunks`` y ``ner`` para
+# las entidades que también se consideran frases candidatas.
+KEYWORD_PIPES = (
+    "tok2vec",
+    "morphologizer",
+    "parser",
+    "attribute_ruler",
+    "lemmatizer",
+    "ner",
+    "textrank",
+    "keyword_phrases",
+)
+KEYWORD_BATCH_SIZE = 256
+# En el modo ``top_k`` el resumen de candidatos guarda este múltiplo de
+# ``top_k`` palabras clave.
+KEYWORD_SKETCH_FACTOR = 10
+
+# Versiones con las que se guardan los resultados en el caché; deben
+# cambiarse al actualizar un modelo para no reutilizar resultados viejos.
+KEYWORD_CACHE_VERSION = "es_core_news_md-3.4.0/pytextrank-3.2.4"
+SENTIMENT_CACHE_VERSION = "pysentimiento-0.4.0/sentiment-es"
+FLESCH_CACHE_VERSION = "fernandez-huerta/pyphen-0.13.2"
+
+
+def extract_keywords(sentences, batch_size=KEYWORD_BATCH_SIZE, n_process=1):
+    """
+    Extrae la palabra clave principal de cada frase.
+
+    Procesa las frases como un flujo con ``nlp.pipe`` desactivando los
+    componentes que TextRank no necesita. Con ``n_process`` mayor a uno
+    spaCy reparte los lotes entre varios procesos.
+
+    Parámetros
+    ----------
+    sentences : iterable
+        Frases a procesar.
+    batch_size : int, optional
+        Número de frases que spaCy agrupa por lote.
+    n_process : int, optional
+        Número de procesos a usar.
+
+    Retorna
+    -------
+    generator
+        Por cada frase, la lista con el texto de su frase clave principal.
+
+    Véase También
+    -------------
+    model_tools.get_model : Obtiene el modelo de procesamiento de lenguaje natural (NLP).
+    spacy.Language.pipe : Procesa textos como un flujo de documentos.
+    """
+    nlp = model_tools.get_model(model_tools.SPACY_MODEL)
+    disable = [name for name in nlp.pipe_names if name not in KEYWORD_PIPES]
+    for doc in nlp.pipe(
+        sentences, batch_size=batch_size, n_process=n_process, disable=disable
+    ):
+        yield doc._.keyword_phrases
+
+
+@profile_tools.profiled("palabras_clave", items_arg="text")
+def get_frecuency_key_words(
+    text,
+    batch_size=KEYWORD_BATCH_SIZE,
+    n_process=1,
+    similarity_threshold=0.5,
+    cache=None,
+    top_k=None,
+    sketch_capacity=None,
+):
     """
     Obtiene la frecuencia de palabras clave.
 
@@ -17,10 +88,37 @@ def get_frecuency_key_words(text):
     se considera como el mismo y con ello aumenta el contador de
     frecuencia.
 
+    Con ``top_k`` la memoria no crece con el número de palabras clave
+    distintas: las palabras extraídas pasan conforme se extraen por un
+    resumen ``keyword_tools.SpaceSaving`` de tamaño fijo y sólo sus
+    candidatas se cuentan de forma exacta en todas las frases. El
+    resultado se ordena y reporta con la misma medida que el modo
+    completo (frases que contienen la palabra), pero las candidatas se
+    eligen por el número de frases de las que se extrajo cada palabra,
+    que puede ser menor. Una palabra clave extraída en más de
+    ``N / sketch_capacity`` frases (con ``N`` el total de palabras
+    extraídas) siempre es candidata, y si todas las palabras del
+    resultado completo son candidatas ambos modos coinciden; una palabra
+    que aparece en muchas frases pero casi nunca se extrae puede faltar.
+
     Parámetros
     ----------
-    text : str
-        El texto a analizar.
+    text : str, iterable or corpus_tools.Corpus
+        El texto, los documentos (tweets) o el corpus ya preparado a analizar.
+    batch_size : int, optional
+        Número de frases que spaCy agrupa por lote.
+    n_process : int, optional
+        Número de procesos que usa spaCy para extraer las palabras clave.
+    similarity_threshold : float, optional
+        Similitud a partir de la cual dos palabras clave se consideran la misma.
+    cache : cache_tools.ResultCache, optional
+        Caché de palabras clave por frase.
+    top_k : int, optional
+        Si se indica, sólo se retornan las ``top_k`` palabras clave más
+        frecuentes, contadas en memoria acotada.
+    sketch_capacity : int, optional
+        Palabras clave candidatas en el modo ``top_k``; por defecto
+        ``top_k * KEYWORD_SKETCH_FACTOR``.
     
     Retorna
     -------
@@ -29,53 +127,206 @@ def get_frecuency_key_words(text):
     
     Véase También
     -------------
-    spacy.load : Carga un modelo de procesamiento de lenguaje natural (NLP)
-    string.split : Separa un string en varios segmentos por medio de un token.
-    string.replace : Reemplaza un token por otro.
-    string.strip : Eliminar los espacios al principio y al final del string.
+    extract_keywords : Extrae la palabra clave principal de cada frase.
+    corpus_tools.as_corpus : Convierte la entrada de un analizador en un ``Corpus``.
     len : Retorna el número de elementos de un objeto o lista.
     list.append : Agrega un elemento al final de una lista
-    dict.keys : Visualiza las claves contenidos en el diccionario de datos.
-    Levenshtein.similarity : Evalua la similitud de dos palabras.
+    keyword_tools.KeywordIndex : Índice de búsqueda simultánea de palabras clave.
+    keyword_tools.cluster_keywords : Agrupa palabras clave casi idénticas.
+    keyword_tools.SpaceSaving : Conteo aproximado de los elementos más frecuentes.
     """
-    lev = Levenshtein()
-    nlp = spacy.load("es_core_news_md")
-    nlp.add_pipe("textrank")
     keywors_found = {}
-    sentences = []
     words = []
-    sentences = text.split("\n")
-    sentences = [line.replace("\n", "") for line in sentences if line.strip()]
-    for sentence in sentences:
-        doc = nlp(sentence)
-        for keyword in doc._.phrases[:1]:
-            # doc.noun_chunks:
-            keyword = keyword.text
+    sketch = None
+    if top_k is not None:
+        sketch = keyword_tools.SpaceSaving(
+            sketch_capacity or top_k * KEYWORD_SKETCH_FACTOR
+        )
+        # Posición de la primera extracción de las candidatas, para
+        # indexarlas en el mismo orden que el modo completo.
+        first_seen = {}
+    corpus = corpus_tools.as_corpus(text)
+    # Sólo se extraen las frases únicas; el orden de primera aparición de
+    # las palabras clave es el mismo que al recorrer todas las frases.
+    sentences = corpus.unique_sentences
+    sentence_phrases = cache_tools.cached_iter(
+        cache,
+        "keywords",
+        KEYWORD_CACHE_VERSION,
+        sentences,
+        lambda pending: extract_keywords(pending, batch_size, n_process),
+    )
+    position = 0
+    for phrases, weight in zip(sentence_phrases, corpus.weights):
+        for keyword in phrases:
             if len(keyword) > 1:
                 # if len(keyword) > 4:
                 #     keyword = str(keyword[:4]) + " ..."
-                words.append(str(clear_alphanumeric_text(keyword)))
-    for word in words:
-        if word not in keywors_found:
-            keywors_found[word] = 0
-    for sentence in sentences:
-        for k_word in keywors_found.keys():
-            if k_word in sentence:
-                keywors_found[k_word] += 1
-    for k_word in list(keywors_found):
-        for another_k_word in keywors_found.keys():
-            if k_word != another_k_word:
-                if lev.similarity(k_word, another_k_word) > 0.5:
-                    keywors_found[another_k_word] += 1
-                    del keywors_found[k_word]
-                    break
+                keyword = str(clear_alphanumeric_text(keyword))
+                if sketch is None:
+                    words.append(keyword)
+                    continue
+                sketch.add(keyword, weight)
+                first_seen.setdefault(keyword, position)
+                position += 1
+                if len(first_seen) > 2 * sketch.capacity:
+                    first_seen = {
+                        keyword: seen
+                        for keyword, seen in first_seen.items()
+                        if keyword in sketch
+                    }
+    if sketch is not None:
+        # El resumen sólo elige las candidatas; su frecuencia se cuenta
+        # de forma exacta igual que en el modo completo.
+        words = sorted(
+            (keyword for keyword, _, _ in sketch.top()),
+            key=first_seen.__getitem__,
+        )
+    keywors_found = keyword_tools.KeywordIndex(words).count_sentences(
+        sentences, corpus.weights
+    )
+    keywors_found = keyword_tools.cluster_keywords(
+        keywors_found, similarity_threshold
+    )
     keywors_found_sort = dict(
-        sorted(keywors_found.items(), key=operator.itemgetter(1), reverse=True)
+        sorted(keywors_found.items(), key=operator.itemgetter(1), reverse=True)[:top_k]
     )
     return keywors_found_sort
 
 
-def get_sentiment_analyze(text):
+class SentimentResult:
+    """
+    Resultado de una pasada del analizador de sentimientos.
+
+    Guarda, en el mismo orden, cada frase analizada con su etiqueta
+    (``POS``, ``NEG`` o ``NEU``) y sus probabilidades, de modo que el
+    conteo y el detalle por frase salen de la misma inferencia.
+
+    Atributos
+    ---------
+    sentences : sequence
+        Frases analizadas; con un corpus es su ``SentenceView``, que no
+        copia las frases.
+    labels : list
+        Etiqueta predicha para cada frase.
+    probas : list
+        Diccionario de probabilidades por etiqueta para cada frase.
+    """
+
+    LABEL_NAMES = {"POS": "Positive", "NEG": "Negative", "NEU": "Neutral"}
+
+    def __init__(self, sentences, labels, probas):
+        self.sentences = sentences
+        self.labels = labels
+        self.probas = probas
+
+    def __len__(self):
+        return len(self.sentences)
+
+    @property
+    def counts(self):
+        """
+        Cuenta las frases de cada tipo de sentimiento.
+
+        Retorna
+        -------
+        dict
+            Número de frases positivas, negativas y neutrales.
+        """
+        counter_sentiments = {"Positive": 0, "Negative": 0, "Neutral": 0}
+        for label in self.labels:
+            if label in self.LABEL_NAMES:
+                counter_sentiments[self.LABEL_NAMES[label]] += 1
+        return counter_sentiments
+
+    @property
+    def detail(self):
+        """
+        Relaciona cada frase con el sentimiento que más transmite.
+
+        Retorna
+        -------
+        dict
+            Diccionario ``frase -> etiqueta``.
+        """
+        return {
+            sentence: label
+            for sentence, label in zip(self.sentences, self.labels)
+            if label in self.LABEL_NAMES
+        }
+
+
+@profile_tools.profiled("sentimientos", items_arg="text")
+def get_sentiment_result(
+    text,
+    batch_size=sentiment_tools.DEFAULT_BATCH_SIZE,
+    max_length=sentiment_tools.DEFAULT_MAX_LENGTH,
+    num_threads=None,
+    cache=None,
+    backend=None,
+):
+    """
+    Ejecuta una sola pasada del analizador de sentimientos.
+
+    Cada frase del texto pasa una única vez por el modelo, agrupada en
+    lotes; tanto ``get_sentiment_analyze`` como ``get_sentiment_detail``
+    se calculan a partir de este resultado.
+
+    Parámetros
+    ----------
+    text : str, iterable or corpus_tools.Corpus
+        El texto, los documentos (tweets) o el corpus ya preparado a analizar.
+    batch_size : int, optional
+        Número de frases por pasada del modelo.
+    max_length : int, optional
+        Máximo de tokens por frase.
+    num_threads : int, optional
+        Hilos de PyTorch a usar.
+    cache : cache_tools.ResultCache, optional
+        Caché de sentimientos por frase; sólo las frases nuevas pasan
+        por el modelo.
+    backend : str, optional
+        Motor del modelo (``sentiment_tools.BACKENDS``); por defecto
+        ``sentiment_tools.SENTIMENT_BACKEND``.
+
+    Retorna
+    -------
+    SentimentResult
+        Etiquetas y probabilidades de cada frase.
+
+    Véase También
+    -------------
+    sentiment_tools.predict_batch : Predice el sentimiento de una lista de frases por lotes.
+    """
+    corpus = corpus_tools.as_corpus(text)
+    backend = backend or sentiment_tools.SENTIMENT_BACKEND
+    # Los motores ONNX dan probabilidades ligeramente distintas, así que
+    # sus resultados se guardan aparte en el caché.
+    version = SENTIMENT_CACHE_VERSION
+    if backend != "torch":
+        version = f"{version}/{backend}"
+
+    def predict(pending):
+        labels, probas = sentiment_tools.predict_batch(
+            pending,
+            batch_size=batch_size,
+            max_length=max_length,
+            num_threads=num_threads,
+            backend=backend,
+        )
+        return [[label, proba] for label, proba in zip(labels, probas)]
+
+    # Las frases repetidas sólo pasan una vez por el modelo.
+    predictions = cache_tools.cached_map(
+        cache, "sentiment", version, corpus.unique_sentences, predict
+    )
+    labels = corpus.expand([label for label, _ in predictions])
+    probas = corpus.expand([proba for _, proba in predictions])
+    return SentimentResult(corpus.sentences, labels, probas)
+
+
+@profile_tools.profiled("sentimientos_conteo")
+def get_sentiment_analyze(text, sentiment_result=None):
     """
     Realiza el análisis de sentimientos de un texto.
 
@@ -85,8 +336,11 @@ def get_sentiment_analyze(text):
 
     Parámetros
     ----------
-    text : str
-        El texto a analizar.
+    text : str, iterable or corpus_tools.Corpus
+        El texto, los documentos (tweets) o el corpus ya preparado a analizar.
+    sentiment_result : SentimentResult, optional
+        Resultado previo de ``get_sentiment_result``; si se proporciona
+        no se vuelve a ejecutar el modelo.
     
     Retorna
     -------
@@ -95,28 +349,15 @@ def get_sentiment_analyze(text):
     
     Véase También
     -------------
-    string.split : Separa un string en varios segmentos por medio de un token.
-    string.replace : Reemplaza un token por otro.
-    string.strip : Eliminar los espacios al principio y al final del string.
-    pysentimiento.create_analyzer : Crea un analizador para una tarea en específico.
-    pysentimiento.predict : Predice el sentimiento que emula la frase analizada.
+    get_sentiment_result : Ejecuta una sola pasada del analizador de sentimientos.
     """
-    counter_sentiments = {"Positive": 0, "Negative": 0, "Neutral": 0}
-    sentences = text.split("\n")
-    sentences = [line.replace("\n", "") for line in sentences if line.strip()]
-    analyzer = create_analyzer(task="sentiment", lang="es")
-    for sentence in sentences:
-        result_sentiment = analyzer.predict(sentence).output
-        if result_sentiment == "NEG":
-            counter_sentiments["Negative"] += 1
-        elif result_sentiment == "POS":
-            counter_sentiments["Positive"] += 1
-        elif result_sentiment == "NEU":
-            counter_sentiments["Neutral"] += 1
-    return counter_sentiments
-
-
-def get_flesch_kincaid_test(text):
+    if sentiment_result is None:
+        sentiment_result = get_sentiment_result(text)
+    return sentiment_result.counts
+
+
+@profile_tools.profiled("legibilidad", items_arg="text")
+def get_flesch_kincaid_test(text, cache=None):
     """
     Realiza la prueba Flesch Kincaid.
 
@@ -126,8 +367,10 @@ def get_flesch_kincaid_test(text):
 
     Parámetros
     ----------
-    text : str
-        El texto a analizar.
+    text : str, iterable or corpus_tools.Corpus
+        El texto, los documentos (tweets) o el corpus ya preparado a analizar.
+    cache : cache_tools.ResultCache, optional
+        Caché de legibilidad por frase.
     
     Retorna
     -------
@@ -136,21 +379,22 @@ def get_flesch_kincaid_test(text):
     
     Véase También
     -------------
-    textstat.set_lang : Establece el idioma de las frases a analizar.
-    string.split : Separa un string en varios segmentos por medio de un token.
-    string.replace : Reemplaza un token por otro.
-    string.strip : Eliminar los espacios al principio y al final del string.
-    textstat.flesch_reading_ease : Analiza la legibilidad de una frase.
+    corpus_tools.as_corpus : Convierte la entrada de un analizador en un ``Corpus``.
+    readability_tools.flesch_scores : Calcula la legibilidad de varias frases.
     """
-    textstat.set_lang("es")
-    result_list = []
-    sentences = text.split("\n")
-    sentences = [line.replace("\n", "") for line in sentences if line.strip()]
-    result_list = [textstat.flesch_reading_ease(sentence) for sentence in sentences]
-    return result_list
+    corpus = corpus_tools.as_corpus(text)
+    result_list = cache_tools.cached_map(
+        cache,
+        "flesch",
+        FLESCH_CACHE_VERSION,
+        corpus.unique_sentences,
+        lambda pending: readability_tools.flesch_scores(pending).tolist(),
+    )
+    return corpus.expand(result_list)
 
 
-def get_sentiment_detail(text):
+@profile_tools.profiled("sentimientos_detalle")
+def get_sentiment_detail(text, sentiment_result=None):
     """
     Obtiene información más detallada de los sentimientos que emula un texto.
 
@@ -158,8 +402,11 @@ def get_sentiment_detail(text):
 
     Parámetros
     ----------
-    text : str
-        El texto a analizar.
+    text : str, iterable or corpus_tools.Corpus
+        El texto, los documentos (tweets) o el corpus ya preparado a analizar.
+    sentiment_result : SentimentResult, optional
+        Resultado previo de ``get_sentiment_result``; si se proporciona
+        no se vuelve a ejecutar el modelo.
     
     Retorna
     -------
@@ -168,25 +415,11 @@ def get_sentiment_detail(text):
     
     Véase También
     -------------
-    string.split : Separa un string en varios segmentos por medio de un token.
-    string.replace : Reemplaza un token por otro.
-    string.strip : Eliminar los espacios al principio y al final del string.
-    pysentimiento.create_analyzer : Crea un analizador para una tarea en específico.
-    pysentimiento.predict : Predice el sentimiento que emula la frase analizada.
+    get_sentiment_result : Ejecuta una sola pasada del analizador de sentimientos.
     """
-    counter_sentiments = {}
-    sentences = text.split("\n")
-    sentences = [line.replace("\n", "") for line in sentences if line.strip()]
-    analyzer = create_analyzer(task="sentiment", lang="es")
-    for sentence in sentences:
-        result_sentiment = analyzer.predict(sentence).output
-        if result_sentiment == "NEG":
-            counter_sentiments[sentence] = "NEG"
-        elif result_sentiment == "POS":
-            counter_sentiments[sentence] = "POS"
-        elif result_sentiment == "NEU":
-            counter_sentiments[sentence] = "NEU"
-    return counter_sentiments
+    if sentiment_result is None:
+        sentiment_result = get_sentiment_result(text)
+    return sentiment_result.detail
 
 
 def clear_alphanumeric_text(text):
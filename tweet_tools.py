@@ -0,0 +1,145 @@
+import json
+from collections import namedtuple
+
+CHUNK_SIZE = 1 << 16
+
+Tweet = namedtuple("Tweet", ["id", "full_text", "details"])
+Tweet.__doc__ = """
+Tweet descargado.
+
+Atributos
+---------
+id : str
+    Identificador del tweet (la llave en el archivo de descarga).
+full_text : str
+    Texto completo del tweet.
+details : dict
+    Registro completo del tweet tal como viene en el archivo.
+"""
+
+_WHITESPACE = " \t\r\n"
+
+
+class _StreamReader:
+    """
+    Lee un archivo de texto por bloques para decodificar JSON por partes.
+    """
+
+    def __init__(self, f, chunk_size):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos :] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        while True:
+            buffer = self.buffer
+            while self.pos < len(buffer) and buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(buffer):
+                return buffer[self.pos]
+            if not self.fill():
+                raise json.JSONDecodeError(
+                    "Fin de archivo inesperado", self.buffer, self.pos
+                )
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise json.JSONDecodeError(f"Se esperaba {char!r}", self.buffer, self.pos)
+        self.pos += 1
+
+    def value(self, decoder):
+        self.peek()
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self.eof or not self.fill():
+                    raise
+                continue
+            # Un número al final del bloque puede estar incompleto.
+            if end == len(self.buffer) and not self.eof and self.fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_tweets(path, encoding="latin1", chunk_size=CHUNK_SIZE):
+    """
+    Lee los tweets de un archivo de descarga de forma incremental.
+
+    El archivo que genera ``scrape_keyword_with_api`` es un objeto JSON
+    ``{id: {"tweet_details": {...}, ...}}``; en lugar de cargarlo completo
+    con ``json.load`` se decodifica un tweet a la vez, así que la memoria
+    no depende del tamaño del archivo.
+
+    Parámetros
+    ----------
+    path : str
+        Ruta del archivo JSON.
+    encoding : str, optional
+        Codificación del archivo.
+    chunk_size : int, optional
+        Número de caracteres que se leen por bloque.
+
+    Retorna
+    -------
+    generator
+        Un ``Tweet`` por cada registro del archivo, en orden.
+
+    Véase También
+    -------------
+    json.JSONDecoder.raw_decode : Decodifica un documento JSON desde una posición.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, encoding=encoding) as f:
+        reader = _StreamReader(f, chunk_size)
+        reader.expect("{")
+        if reader.peek() == "}":
+            return
+        while True:
+            tweet_id = reader.value(decoder)
+            reader.expect(":")
+            record = reader.value(decoder)
+            details = {}
+            if isinstance(record, dict):
+                details = record.get("tweet_details", {})
+            yield Tweet(tweet_id, details.get("full_text", ""), record)
+            separator = reader.peek()
+            reader.pos += 1
+            if separator == "}":
+                return
+            if separator != ",":
+                raise json.JSONDecodeError(
+                    "Se esperaba ',' o '}'", reader.buffer, reader.pos - 1
+                )
+
+
+def iter_documents(path, encoding="latin1"):
+    """
+    Lee únicamente el texto de cada tweet de un archivo de descarga.
+
+    Parámetros
+    ----------
+    path : str
+        Ruta del archivo JSON.
+    encoding : str, optional
+        Codificación del archivo.
+
+    Retorna
+    -------
+    generator
+        El ``full_text`` de cada tweet.
+    """
+    for tweet in iter_tweets(path, encoding):
+        yield tweet.full_text